@@ -1,6 +1,10 @@
 import streamlit as st
 import hashlib
 import json
+from analysis.cache import content_hash
+from analysis.catalog import CatalogTrip, TripCatalog, parse_bbox
+from analysis.loading import load_frames
+from analysis.session_store import get_session_store
 
 # Login-Funktion mit Hash-Vergleich
 def login():
@@ -34,26 +38,90 @@ if "auth" not in st.session_state:
 st.set_page_config(page_title="Radio Trace Analyzer", layout="centered")
 
 st.title("📡 Radio Trace Analyzer")
-st.markdown("Willkommen! Bitte lade deine JSON-Dateien hoch, um mit der Analyse zu beginnen.")
+st.markdown("Willkommen! Bitte lade deine JSON- oder Spaltendateien (.rtc) hoch oder wähle Fahrten aus dem Katalog, um mit der Analyse zu beginnen.")
 
 # Initialisieren
 if "uploaded_files" not in st.session_state:
     st.session_state.uploaded_files = []
 
-# Uploadfeld
-uploaded = st.file_uploader("📤 JSON-Dateien hochladen", type="json", accept_multiple_files=True)
+store = get_session_store(st.session_state)
 
-# Datei zur Session hinzufügen
+# Uploadfeld; neuer Key nach jeder Übernahme leert das Feld, damit Streamlit die Upload-Bytes freigibt
+upload_round = st.session_state.setdefault("upload_round", 0)
+uploaded = st.file_uploader("📤 JSON-Dateien hochladen", type=["json", "rtc", "gz", "bz2", "xz", "zip"], accept_multiple_files=True, key=f"upload_{upload_round}")
+st.page_link("pages/Ingest.py", label="⚙️ Noch nicht extrahiert? Rohtraces auf dem Server extrahieren")
+
+# Datei auf die Platte der Session übernehmen
 if uploaded:
     for file in uploaded:
         if file.name not in [f.name for f in st.session_state.uploaded_files]:
-            st.session_state.uploaded_files.append(file)
+            st.session_state.uploaded_files.append(store.add(file.name, file.getvalue()))
+    st.session_state.upload_round += 1
+    st.rerun()
+
+@st.cache_resource
+def get_catalog():
+    return TripCatalog()
+
+# Fahrten aus dem Katalog: einmal übernommen, danach ohne erneutes Hochladen abfragbar
+with st.expander("🗄️ Fahrten aus dem Katalog laden"):
+    col1, col2 = st.columns(2)
+    mode = col1.selectbox("Radiomodus", ["Alle", "DAB", "FM"])
+    channel = col2.text_input("Kanal (z. B. 5C) oder Frequenz in kHz")
+    col3, col4 = st.columns(2)
+    use_since = col3.checkbox("Nur Fahrten ab Datum")
+    since = col4.date_input("Ab", disabled=not use_since)
+    area = st.text_input("Gebiet (lat1, lon1, lat2, lon2)")
+
+    try:
+        found = get_catalog().find(
+            typ=None if mode == "Alle" else mode.lower(),
+            channel=channel.strip() or None,
+            since=since if use_since else None,
+            bbox=parse_bbox(area) if area.strip() else None
+        )
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        found = None
+
+    if found is not None and found.empty:
+        st.info("Keine passenden Fahrten im Katalog.")
+    elif found is not None:
+        st.dataframe(found[["source", "start", "end", "fixes", "types"]], hide_index=True)
+        if st.button(f"➕ {len(found)} Fahrten zur Analyse hinzufügen"):
+            names = [f.name for f in st.session_state.uploaded_files]
+            digests = {getattr(f, "digest", None) for f in st.session_state.uploaded_files}
+            for trip in found.itertuples():
+                if trip.digest in digests:
+                    continue
+                # Gleichnamige Fahrten (z. B. trace_extracted.json mehrerer Fahrzeuge) über die Katalognummer unterscheiden
+                name = trip.source if trip.source not in names else f"{trip.source} #{trip.id}"
+                names.append(name)
+                st.session_state.uploaded_files.append(CatalogTrip(name, trip.digest, int(trip.id)))
+            st.rerun()
 
 # Liste der aktuellen Uploads
 if st.session_state.uploaded_files:
     st.markdown("### 📁 Hochgeladene Dateien:")
     for file in st.session_state.uploaded_files:
-        st.write(f"✅ {file.name}")
+        st.write(f"{'🗄️' if isinstance(file, CatalogTrip) else '✅'} {file.name}")
+
+    uploads = [f for f in st.session_state.uploaded_files if not isinstance(f, CatalogTrip)]
+    if uploads and st.button("🗄️ Hochgeladene Dateien in den Katalog übernehmen"):
+        for file in uploads:
+            try:
+                content = file.getvalue()
+            except FileNotFoundError:
+                st.warning(f"⚠️ Datei '{file.name}' ist nicht mehr gespeichert, bitte erneut hochladen.")
+                st.session_state.uploaded_files.remove(file)
+                continue
+            try:
+                digest = getattr(file, "digest", None) or content_hash(content)
+                _, new = get_catalog().ingest(file.name, load_frames(file.name, content), digest)
+            except ValueError:
+                st.error(f"❌ Datei '{file.name}' konnte nicht gelesen werden.")
+                continue
+            st.write(f"{'Übernommen' if new else 'Bereits im Katalog'}: {file.name}")
 
     # Button zur Analyse
     if st.button("🔍 Analyse starten"):
@@ -0,0 +1,87 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from analysis.engine import route_summary, trip_summary
+from analysis.loading import load_file
+
+logger = logging.getLogger("radioanalyse.perf")
+
+# Auswertung vieler extrahierter Fahrten ohne Oberfläche:
+#   python -m analysis.batch <ordner> [-o <zielordner>] [-w <prozesse>]
+# schreibt trips.csv (pro Fahrt, Modus und Kanal) und routes.csv (pro Strecke)
+
+def find_trips(directory):
+    # Pro Fahrt die .rtc bevorzugen, wenn daneben auch die JSON-Ausgabe liegt
+    paths = {}
+    for pattern in ("*_extracted.json", "*.rtc"):
+        for path in sorted(glob.glob(os.path.join(directory, pattern))):
+            paths[os.path.splitext(path)[0]] = path
+    return sorted(paths.values())
+
+def summarize_file(path):
+    # Läuft im Worker-Prozess; Fehler einzelner Dateien brechen den Lauf nicht ab
+    try:
+        return trip_summary(os.path.basename(path), load_file(path)), None
+    except (OSError, ValueError, KeyError) as e:
+        return [], f"{os.path.basename(path)}: {e}"
+
+def run_batch(paths, workers=1, progress_callback=None):
+    rows, errors = [], []
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(summarize_file, paths, chunksize=max(len(paths) // (workers * 4), 1))
+            for i, (trip_rows, error) in enumerate(results):
+                rows.extend(trip_rows)
+                if error:
+                    errors.append(error)
+                if progress_callback:
+                    progress_callback(i + 1, len(paths))
+    else:
+        for i, path in enumerate(paths):
+            trip_rows, error = summarize_file(path)
+            rows.extend(trip_rows)
+            if error:
+                errors.append(error)
+            if progress_callback:
+                progress_callback(i + 1, len(paths))
+
+    trips = pd.DataFrame(rows)
+    return trips, route_summary(trips) if not trips.empty else pd.DataFrame(), errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-Auswertung extrahierter Fahrten")
+    parser.add_argument("directory", help="Ordner mit *_extracted.json bzw. .rtc-Dateien")
+    parser.add_argument("-o", "--output", default=".", help="Zielordner für trips.csv und routes.csv (Standard: .)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Anzahl paralleler Prozesse (Standard: alle Kerne)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Messwerte als strukturierte Logzeilen ausgeben")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(name)s %(message)s")
+
+    paths = find_trips(args.directory)
+    if not paths:
+        parser.error(f"Keine Fahrten in '{args.directory}' gefunden")
+
+    started = time.perf_counter()
+    trips, routes, errors = run_batch(paths, max(args.workers, 1))
+    seconds = time.perf_counter() - started
+    logger.info(json.dumps({"stage": "batch", "files": len(paths), "rows": len(trips), "seconds": round(seconds, 4)}))
+
+    os.makedirs(args.output, exist_ok=True)
+    trips.to_csv(os.path.join(args.output, "trips.csv"), index=False)
+    routes.to_csv(os.path.join(args.output, "routes.csv"), index=False)
+    for error in errors:
+        print(f"Übersprungen: {error}")
+    n_routes = routes["route"].nunique() if not routes.empty else 0
+    print(f"{len(paths) - len(errors)} Fahrten, {n_routes} Strecken in {seconds:.1f} s")
+    print(f"Gespeichert: {os.path.join(args.output, 'trips.csv')}, {os.path.join(args.output, 'routes.csv')}")
+
+if __name__ == "__main__":
+    main()
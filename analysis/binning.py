@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+from analysis.geo import EARTH_RADIUS_M, local_xy
+
+# Grenzen der Güteklassen (sehr gut, gut, mittel, schlecht) für TL [dBm] bzw. FS [dBμV]
+THRESHOLDS = {True: [-40, -60, -80], False: [60, 40, 20]}
+CLASS_NAMES = ["Sehr gut", "Gut", "Mittel", "Schlecht", "Keine Daten"]
+PALETTE = np.array([[0, 180, 0], [160, 220, 100], [255, 220, 0], [255, 70, 70], [255, 255, 255]], dtype=np.uint8)
+NO_DATA = len(CLASS_NAMES) - 1
+
+def coverage_class(values, is_dab):
+    values = np.asarray(values, dtype=float)
+    classes = np.full(len(values), 3, dtype=np.int8)
+    for cls, limit in reversed(list(enumerate(THRESHOLDS[is_dab]))):
+        classes[values > limit] = cls
+    classes[np.isnan(values)] = NO_DATA
+    return classes
+
+def bin_radio_to_gnss(gnss_df, radio_df, col):
+    # Jeder Radiowert fällt in das GNSS-Intervall (t[k-1], t[k]] seiner Quelle;
+    # ein sortierter Durchlauf pro Quelle statt einer Maske pro Fix
+    df = gnss_df.sort_values("timeStamp", kind="stable").reset_index(drop=True)
+    n = len(df)
+    mean = np.full(n, np.nan)
+    vmin = np.full(n, np.nan)
+    vmax = np.full(n, np.nan)
+    count = np.zeros(n, dtype=np.int64)
+
+    gnss_times = df["timeStamp"].to_numpy()
+    radio_by_source = dict(tuple(radio_df.groupby("source", sort=False, observed=True)))
+    for src, positions in df.groupby("source", sort=False, observed=True).indices.items():
+        radio = radio_by_source.get(src)
+        if radio is None or radio.empty:
+            continue
+        radio = radio.sort_values("timeStamp", kind="stable")
+        times = gnss_times[positions]
+        values = radio[col].to_numpy(dtype=float)
+
+        k = np.searchsorted(times, radio["timeStamp"].to_numpy(), side="left")
+        valid = (k >= 1) & (k < len(times)) & ~np.isnan(values)
+        k, values = k[valid], values[valid]
+        if not len(k):
+            continue
+
+        # k ist aufsteigend - gleiche Intervalle liegen zusammen
+        bins, starts = np.unique(k, return_index=True)
+        target = positions[bins]
+        count[target] = np.diff(np.append(starts, len(k)))
+        mean[target] = np.add.reduceat(values, starts) / count[target]
+        vmin[target] = np.minimum.reduceat(values, starts)
+        vmax[target] = np.maximum.reduceat(values, starts)
+
+    df[col] = mean
+    df[f"{col}_min"] = vmin
+    df[f"{col}_max"] = vmax
+    df[f"{col}_count"] = count
+    return df
+
+def assign_colors(gnss_df, radio_df, col, is_dab):
+    df = bin_radio_to_gnss(gnss_df, radio_df, col)
+    classes = coverage_class(df[col].to_numpy(), is_dab)
+    df["coverage"] = pd.Categorical.from_codes(classes, CLASS_NAMES)
+    return add_rgb(df, classes)
+
+def add_rgb(df, classes):
+    # Farbe als drei uint8-Spalten statt einer Liste pro Zeile; pydeck: get_fill_color="[r, g, b]"
+    rgb = PALETTE[classes]
+    df["r"], df["g"], df["b"] = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    return df
+
+def cell_size_for_zoom(zoom, lat, pixels=8):
+    # Web-Mercator: Meter pro Pixel bei gegebener Zoomstufe, Zelle ~pixels Pixel breit
+    meters_per_pixel = 156543.03 * np.cos(np.radians(lat)) / 2 ** zoom
+    return float(max(meters_per_pixel * pixels, 1.0))
+
+def grid_cells(df, col, cell_m, is_dab):
+    # Fixes mit ihren Intervallwerten (aus bin_radio_to_gnss) zu quadratischen Rasterzellen zusammenfassen
+    lat0, lon0 = float(df["lat"].mean()), float(df["lon"].mean())
+    x, y = local_xy(df["lat"].to_numpy(), df["lon"].to_numpy(), lat0, lon0)
+    counts = df[f"{col}_count"].to_numpy()
+    values = df[col].to_numpy(dtype=float)
+    has_value = counts > 0
+
+    cells = pd.DataFrame({
+        "cx": np.floor(x / cell_m).astype(np.int64),
+        "cy": np.floor(y / cell_m).astype(np.int64),
+        "weighted": np.where(has_value, values * counts, 0.0),
+        "samples": counts,
+        "vmin": df[f"{col}_min"].to_numpy(dtype=float),
+        "fixes": 1,
+    }).groupby(["cx", "cy"], sort=False).agg(
+        weighted=("weighted", "sum"), samples=("samples", "sum"), vmin=("vmin", "min"), fixes=("fixes", "sum")
+    ).reset_index()
+
+    # Mittelwert über alle Radiowerte der Zelle (gewichtet mit der Anzahl je Intervall)
+    mean = np.where(cells["samples"] > 0, cells["weighted"] / cells["samples"].where(cells["samples"] > 0, 1), np.nan)
+    classes = coverage_class(mean, is_dab)
+
+    # Südwest-Ecke der Zelle zurück nach lat/lon (für GridCellLayer)
+    lat_sw = lat0 + np.degrees(cells["cy"].to_numpy() * cell_m / EARTH_RADIUS_M)
+    lon_sw = lon0 + np.degrees(cells["cx"].to_numpy() * cell_m / (EARTH_RADIUS_M * np.cos(np.radians(lat0))))
+    return add_rgb(pd.DataFrame({
+        "lat": lat_sw,
+        "lon": lon_sw,
+        col: np.round(mean, 1),
+        f"{col}_min": cells["vmin"].to_numpy(),
+        "samples": cells["samples"].to_numpy(),
+        "fixes": cells["fixes"].to_numpy(),
+        "coverage": np.asarray(CLASS_NAMES, dtype=object)[classes],
+    }), classes)
@@ -0,0 +1,69 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+def frames_nbytes(value):
+    # Speicherbedarf von DataFrames/Arrays/Bytes, auch verschachtelt in dicts, Listen und Tupeln
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(frames_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(frames_nbytes(v) for v in value)
+    return 0
+
+class FrameCache:
+    # LRU-Cache für geparste Fahrten, begrenzt über den Speicherbedarf der DataFrames
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            self.entries.move_to_end(key)
+            return item[0]
+
+    def put(self, key, frames):
+        size = frames_nbytes(frames)
+        with self.lock:
+            if key in self.entries:
+                self.nbytes -= self.entries.pop(key)[1]
+            self.entries[key] = (frames, size)
+            self.nbytes += size
+            # Der neueste Eintrag bleibt auch dann, wenn er allein das Budget sprengt
+            while self.nbytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def discard(self, key):
+        with self.lock:
+            item = self.entries.pop(key, None)
+            if item is not None:
+                self.nbytes -= item[1]
+
+    def get_or_load(self, key, load):
+        frames = self.get(key)
+        if frames is None:
+            frames = load()
+            self.put(key, frames)
+        return frames
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,332 @@
+import argparse
+import os
+import sqlite3
+import time
+from collections import namedtuple
+from contextlib import closing, contextmanager
+
+import numpy as np
+import pandas as pd
+
+from analysis.cache import content_hash
+from analysis.loading import RECORD_TYPES, compact_frame, load_file
+
+# Dauerhafter Fahrtenkatalog in SQLite: Fahrten werden einmal eingelesen und sind danach
+# über Quelle, Kanal, Zeitraum und Gebiet abfragbar, ohne Dateien erneut zu parsen.
+#   python -m analysis.catalog ingest <dateien...>
+#   python -m analysis.catalog query [--channel 5C] [--since 2024-06-01] [--bbox lat1,lon1,lat2,lon2]
+
+# Standardmäßig im Benutzerverzeichnis, nicht im Arbeitsverzeichnis der App; über RADIO_CATALOG einstellbar
+DEFAULT_PATH = os.environ.get("RADIO_CATALOG", os.path.join(os.path.expanduser("~"), ".radioanalyse", "radio_catalog.sqlite"))
+
+# GNSS-Fixes je R-Tree-Eintrag: grob genug für einen kleinen Index, fein genug,
+# damit die Bounding-Box einer Fahrt nicht ganze Umwege abdeckt
+BLOCK_FIXES = 64
+
+COLUMNS = {
+    "dab": ["F_kHz", "TL", "SNR"],
+    "fm": ["FQ_kHz", "FS", "SNR"],
+    "gnss": ["ts", "lat", "lon", "hdg", "fix", "antenna"],
+}
+CHANNEL_COLUMN = {"dab": "F_kHz", "fm": "FQ_kHz"}
+
+# DAB Band III (Kanal -> Mittenfrequenz in kHz)
+DAB_CHANNELS = {
+    "5A": 174928, "5B": 176640, "5C": 178352, "5D": 180064,
+    "6A": 181936, "6B": 183648, "6C": 185360, "6D": 187072,
+    "7A": 188928, "7B": 190640, "7C": 192352, "7D": 194064,
+    "8A": 195936, "8B": 197648, "8C": 199360, "8D": 201072,
+    "9A": 202928, "9B": 204640, "9C": 206352, "9D": 208064,
+    "10A": 209936, "10N": 210096, "10B": 211648, "10C": 213360, "10D": 215072,
+    "11A": 216928, "11N": 217088, "11B": 218640, "11C": 220352, "11D": 222064,
+    "12A": 223936, "12N": 224096, "12B": 225648, "12C": 227360, "12D": 229072,
+    "13A": 230784, "13B": 232496, "13C": 234208, "13D": 235776, "13E": 237488, "13F": 239200,
+}
+
+# Fahrten sind über den Inhalt (digest) eindeutig, source ist nur der Anzeigename - gleichnamige
+# Dateien verschiedener Fahrzeuge überschreiben sich nicht. path: Herkunft bei Übernahme aus einer Datei
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trips (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    path TEXT UNIQUE,
+    digest TEXT NOT NULL UNIQUE,
+    start_ms INTEGER,
+    end_ms INTEGER,
+    min_lat REAL, max_lat REAL, min_lon REAL, max_lon REAL,
+    fixes INTEGER,
+    ingested_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS trips_time ON trips (start_ms, end_ms);
+CREATE INDEX IF NOT EXISTS trips_source ON trips (source);
+
+CREATE TABLE IF NOT EXISTS trip_channels (
+    trip_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    channel_kHz INTEGER,
+    samples INTEGER,
+    start_ms INTEGER,
+    end_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS trip_channels_channel ON trip_channels (type, channel_kHz, start_ms);
+CREATE INDEX IF NOT EXISTS trip_channels_trip ON trip_channels (trip_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS gnss_blocks USING rtree (
+    id, min_lat, max_lat, min_lon, max_lon, +trip_id, +start_ms, +end_ms
+);
+
+CREATE TABLE IF NOT EXISTS dab (trip_id INTEGER NOT NULL, time_ms INTEGER, F_kHz INTEGER, TL INTEGER, SNR INTEGER);
+CREATE INDEX IF NOT EXISTS dab_trip ON dab (trip_id, time_ms);
+CREATE INDEX IF NOT EXISTS dab_channel ON dab (F_kHz, time_ms);
+
+CREATE TABLE IF NOT EXISTS fm (trip_id INTEGER NOT NULL, time_ms INTEGER, FQ_kHz INTEGER, FS INTEGER, SNR INTEGER);
+CREATE INDEX IF NOT EXISTS fm_trip ON fm (trip_id, time_ms);
+CREATE INDEX IF NOT EXISTS fm_channel ON fm (FQ_kHz, time_ms);
+
+CREATE TABLE IF NOT EXISTS gnss (
+    trip_id INTEGER NOT NULL, time_ms INTEGER, ts REAL, lat REAL, lon REAL, hdg REAL, fix INTEGER, antenna INTEGER
+);
+CREATE INDEX IF NOT EXISTS gnss_trip ON gnss (trip_id, time_ms);
+"""
+
+# Eintrag in st.session_state.uploaded_files für eine Fahrt aus dem Katalog
+CatalogTrip = namedtuple("CatalogTrip", "name digest trip_id")
+
+def channel_khz(value):
+    # "5C" -> 178352, "178352" / 178352 -> 178352
+    if value is None or value == "":
+        return None
+    text = str(value).strip().upper()
+    if text in DAB_CHANNELS:
+        return DAB_CHANNELS[text]
+    try:
+        return int(float(text))
+    except ValueError:
+        raise ValueError(f"Unbekannter Kanal '{value}'")
+
+def to_ms(value):
+    if value is None:
+        return None
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+def time_ms(df):
+    # NaT wird zu NULL
+    ms = df["timeStamp"].to_numpy(dtype="datetime64[ms]").astype(np.int64)
+    return [None if v == np.iinfo(np.int64).min else v for v in ms.tolist()]
+
+def column_values(df, name):
+    if name not in df.columns:
+        return [None] * len(df)
+    values = pd.to_numeric(df[name], errors="coerce")
+    return values.astype(object).where(values.notna(), None).tolist()
+
+class TripCatalog:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def connect(self):
+        # Eine Verbindung pro Vorgang, damit Streamlit-Threads und Worker sich nichts teilen
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+
+    def ingest(self, name, frames, digest, path=None):
+        # Liefert (trip_id, neu). Gleicher Inhalt wird nur einmal gespeichert, egal unter welchem Namen;
+        # eine Datei am selben Pfad mit anderem Inhalt (z. B. gewachsener Trace) ersetzt ihre alte Fahrt
+        with self.connect() as conn:
+            replaced = conn.execute("SELECT id, digest FROM trips WHERE path = ?", (path,)).fetchone() if path else None
+            row = conn.execute("SELECT id FROM trips WHERE digest = ?", (digest,)).fetchone()
+            if replaced and replaced[1] != digest:
+                self._delete(conn, replaced[0])
+            if row:
+                if path:
+                    conn.execute("UPDATE trips SET path = ? WHERE id = ? AND path IS NULL", (path, row[0]))
+                return row[0], False
+
+            times = pd.concat([df["timeStamp"] for df in frames.values() if not df.empty] or [pd.Series(dtype="datetime64[ns]")])
+            gnss = frames["gnss"]
+            has_fix = not gnss.empty and gnss[["lat", "lon"]].notna().any(axis=None)
+            trip_id = conn.execute(
+                "INSERT INTO trips (source, path, digest, start_ms, end_ms, min_lat, max_lat, min_lon, max_lon, fixes, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name, path, digest,
+                    to_ms(times.min()) if times.notna().any() else None,
+                    to_ms(times.max()) if times.notna().any() else None,
+                    float(gnss["lat"].min()) if has_fix else None, float(gnss["lat"].max()) if has_fix else None,
+                    float(gnss["lon"].min()) if has_fix else None, float(gnss["lon"].max()) if has_fix else None,
+                    len(gnss), int(time.time())
+                )
+            ).lastrowid
+
+            for typ in RECORD_TYPES:
+                df = frames[typ]
+                if df.empty:
+                    continue
+                columns = COLUMNS[typ]
+                rows = zip([trip_id] * len(df), time_ms(df), *(column_values(df, c) for c in columns))
+                conn.executemany(
+                    f"INSERT INTO {typ} (trip_id, time_ms, {', '.join(columns)}) VALUES ({', '.join('?' * (len(columns) + 2))})",
+                    rows
+                )
+                if typ in CHANNEL_COLUMN:
+                    self._ingest_channels(conn, trip_id, typ, df)
+            if has_fix:
+                self._ingest_blocks(conn, trip_id, gnss)
+            return trip_id, True
+
+    def _ingest_channels(self, conn, trip_id, typ, df):
+        stats = df.groupby(CHANNEL_COLUMN[typ]).agg(samples=("timeStamp", "size"), start=("timeStamp", "min"), end=("timeStamp", "max"))
+        conn.executemany(
+            "INSERT INTO trip_channels (trip_id, type, channel_kHz, samples, start_ms, end_ms) VALUES (?, ?, ?, ?, ?, ?)",
+            [(trip_id, typ, int(channel), int(row.samples), to_ms(row.start), to_ms(row.end)) for channel, row in stats.iterrows()]
+        )
+
+    def _ingest_blocks(self, conn, trip_id, gnss):
+        gnss = gnss.dropna(subset=["lat", "lon"]).sort_values("timeStamp", kind="stable")
+        lat, lon = gnss["lat"].to_numpy(dtype=float), gnss["lon"].to_numpy(dtype=float)
+        ms = gnss["timeStamp"].to_numpy(dtype="datetime64[ms]").astype(np.int64)
+        starts = np.arange(0, len(gnss), BLOCK_FIXES)
+        # Blöcke überlappen um einen Fix, damit auch das Stück zwischen zwei Blöcken abgedeckt ist
+        ends = np.minimum(starts + BLOCK_FIXES + 1, len(gnss))
+        conn.executemany(
+            "INSERT INTO gnss_blocks (min_lat, max_lat, min_lon, max_lon, trip_id, start_ms, end_ms) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (float(lat[a:b].min()), float(lat[a:b].max()), float(lon[a:b].min()), float(lon[a:b].max()),
+                 trip_id, int(ms[a]), int(ms[b - 1]))
+                for a, b in zip(starts, ends)
+            ]
+        )
+
+    def _delete(self, conn, trip_id):
+        for table in RECORD_TYPES + ["trip_channels"]:
+            conn.execute(f"DELETE FROM {table} WHERE trip_id = ?", (trip_id,))
+        conn.execute("DELETE FROM gnss_blocks WHERE trip_id = ?", (trip_id,))
+        conn.execute("DELETE FROM trips WHERE id = ?", (trip_id,))
+
+    def ingest_file(self, path):
+        with open(path, "rb") as f:
+            digest = content_hash(f.read())
+        return self.ingest(os.path.basename(path), load_file(path), digest, os.path.abspath(path))
+
+    def find(self, source=None, typ=None, channel=None, since=None, until=None, bbox=None):
+        # bbox: (lat1, lon1, lat2, lon2); liefert eine Zeile pro Fahrt
+        where, params = [], []
+        since_ms, until_ms = to_ms(since), to_ms(until)
+        if source:
+            where.append("t.source LIKE ?")
+            params.append(f"%{source}%")
+        if since_ms is not None:
+            where.append("t.end_ms >= ?")
+            params.append(since_ms)
+        if until_ms is not None:
+            where.append("t.start_ms <= ?")
+            params.append(until_ms)
+        if typ or channel is not None:
+            cond = ["c.trip_id = t.id"]
+            if typ:
+                cond.append("c.type = ?")
+                params.append(typ)
+            if channel is not None:
+                cond.append("c.channel_kHz = ?")
+                params.append(channel_khz(channel))
+            if since_ms is not None:
+                cond.append("c.end_ms >= ?")
+                params.append(since_ms)
+            if until_ms is not None:
+                cond.append("c.start_ms <= ?")
+                params.append(until_ms)
+            where.append(f"EXISTS (SELECT 1 FROM trip_channels c WHERE {' AND '.join(cond)})")
+        if bbox:
+            lat1, lon1, lat2, lon2 = bbox
+            min_lat, max_lat, min_lon, max_lon = min(lat1, lat2), max(lat1, lat2), min(lon1, lon2), max(lon1, lon2)
+            # R-Tree liefert Kandidatenblöcke, die Fixes darin werden exakt geprüft
+            where.append(
+                "EXISTS (SELECT 1 FROM gnss_blocks b JOIN gnss g ON g.trip_id = b.trip_id AND g.time_ms BETWEEN b.start_ms AND b.end_ms "
+                "WHERE b.trip_id = t.id AND b.max_lat >= ? AND b.min_lat <= ? AND b.max_lon >= ? AND b.min_lon <= ? "
+                "AND g.lat BETWEEN ? AND ? AND g.lon BETWEEN ? AND ?)"
+            )
+            params += [min_lat, max_lat, min_lon, max_lon, min_lat, max_lat, min_lon, max_lon]
+
+        query = (
+            "SELECT t.id, t.source, t.path, t.digest, t.start_ms, t.end_ms, t.fixes, "
+            "(SELECT group_concat(DISTINCT c.type) FROM trip_channels c WHERE c.trip_id = t.id) AS types "
+            f"FROM trips t {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY t.start_ms"
+        )
+        with self.connect() as conn:
+            trips = pd.read_sql_query(query, conn, params=params)
+        trips["start"] = pd.to_datetime(trips.pop("start_ms"), unit="ms")
+        trips["end"] = pd.to_datetime(trips.pop("end_ms"), unit="ms")
+        return trips
+
+    def channels(self):
+        with self.connect() as conn:
+            return pd.read_sql_query(
+                "SELECT type, channel_kHz, COUNT(DISTINCT trip_id) AS trips, SUM(samples) AS samples "
+                "FROM trip_channels GROUP BY type, channel_kHz ORDER BY type, channel_kHz",
+                conn
+            )
+
+    def load(self, trip_id, name=None):
+        # Gleiche Form wie loading.load_frames: ein DataFrame pro Datensatztyp.
+        # name ersetzt den gespeicherten Anzeigenamen als Quelle (gleichnamige Fahrten in einer Analyse)
+        with self.connect() as conn:
+            source = conn.execute("SELECT source FROM trips WHERE id = ?", (trip_id,)).fetchone()
+            if source is None:
+                raise KeyError(f"Fahrt {trip_id} nicht im Katalog")
+            name = name or source[0]
+            frames = {}
+            for typ in RECORD_TYPES:
+                df = pd.read_sql_query(
+                    f"SELECT time_ms, {', '.join(COLUMNS[typ])} FROM {typ} WHERE trip_id = ? ORDER BY rowid",
+                    conn, params=(trip_id,)
+                )
+                if df.empty:
+                    frames[typ] = pd.DataFrame()
+                    continue
+                df.insert(0, "timeStamp", pd.to_datetime(df.pop("time_ms"), unit="ms"))
+                frames[typ] = compact_frame(df, typ, name)
+        return frames
+
+def parse_bbox(text):
+    values = [float(v) for v in text.split(",")]
+    if len(values) != 4:
+        raise ValueError("Bereich als lat1,lon1,lat2,lon2 angeben")
+    return tuple(values)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fahrtenkatalog (SQLite)")
+    parser.add_argument("--db", default=DEFAULT_PATH, help=f"Katalogdatei (Standard: {DEFAULT_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Extrahierte Fahrten (.json/.rtc) übernehmen")
+    ingest.add_argument("paths", nargs="+")
+    query = commands.add_parser("query", help="Fahrten suchen")
+    query.add_argument("--source", help="Teil des Dateinamens")
+    query.add_argument("--type", choices=["dab", "fm"], help="Radiomodus")
+    query.add_argument("--channel", help="DAB-Kanal (z. B. 5C) oder Frequenz in kHz")
+    query.add_argument("--since", help="Ab Datum/Zeit (z. B. 2024-06-01)")
+    query.add_argument("--until", help="Bis Datum/Zeit")
+    query.add_argument("--bbox", type=parse_bbox, help="Gebiet als lat1,lon1,lat2,lon2")
+    args = parser.parse_args()
+
+    catalog = TripCatalog(args.db)
+    if args.command == "ingest":
+        for path in args.paths:
+            try:
+                trip_id, new = catalog.ingest_file(path)
+            except (OSError, ValueError) as e:
+                print(f"Übersprungen: {path}: {e}")
+                continue
+            print(f"{'Übernommen' if new else 'Unverändert'}: {os.path.basename(path)} (#{trip_id})")
+    else:
+        trips = catalog.find(args.source, args.type, args.channel, args.since, args.until, args.bbox)
+        print(trips.drop(columns="digest").to_string(index=False) if not trips.empty else "Keine Fahrten gefunden.")
+
+if __name__ == "__main__":
+    main()
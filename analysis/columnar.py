@@ -0,0 +1,60 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Gegenstück zum ColumnarWriter in extractor-python/extract.py
+MAGIC = b"RTCOL01\n"
+
+def is_columnar(data):
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+def _align(pos):
+    return pos + (-pos % 8)
+
+def read_columnar(source):
+    # Pfade werden gemappt, Bytes (z. B. Uploads) ohne Kopie als Puffer gelesen
+    if isinstance(source, (str, os.PathLike)):
+        buf = np.memmap(source, dtype=np.uint8, mode="r")
+    else:
+        buf = np.frombuffer(source, dtype=np.uint8)
+
+    if not is_columnar(buf):
+        raise ValueError("Keine Spaltendatei (.rtc)")
+
+    segments = {}
+    pos = len(MAGIC)
+    while pos < len(buf):
+        if pos + 4 > len(buf):
+            raise ValueError("Spaltendatei ist unvollständig")
+        header_len = int(buf[pos:pos + 4].view("<u4")[0])
+        header = json.loads(bytes(buf[pos + 4:pos + 4 + header_len]))
+        pos = _align(pos + 4 + header_len)
+
+        count = header["count"]
+        columns = {}
+        for name, dtype in header["columns"]:
+            dtype = np.dtype(dtype)
+            end = pos + count * dtype.itemsize
+            if end > len(buf):
+                raise ValueError("Spaltendatei ist unvollständig")
+            columns[name] = buf[pos:end].view(dtype)
+            pos = _align(end)
+        segments.setdefault(header["type"], []).append(columns)
+
+    return {
+        typ: {name: parts[0][name] if len(parts) == 1 else np.concatenate([p[name] for p in parts]) for name in parts[0]}
+        for typ, parts in segments.items()
+    }
+
+def columns_to_frame(columns, source):
+    data = dict(columns)
+    if "timeStamp" in data:
+        data["timeStamp"] = data["timeStamp"].view("datetime64[ms]").astype("datetime64[ns]")
+    rows = len(next(iter(columns.values()))) if columns else 0
+    data["source"] = pd.Categorical.from_codes(np.zeros(rows, dtype=np.int8), categories=[source])
+    return pd.DataFrame(data)
+
+def frames_from_columnar(source, name):
+    return {typ: columns_to_frame(columns, name) for typ, columns in read_columnar(source).items()}
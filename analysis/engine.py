@@ -0,0 +1,224 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from analysis.binning import assign_colors, coverage_class
+from analysis.cache import FrameCache, content_hash
+from analysis.geo import EARTH_RADIUS_M, RouteIndex, haversine_m, route_positions
+from analysis.loading import load_frames
+from analysis.pipeline import (
+    combine_frames, reference_point, resample_trips, split_trips, trip_start_times, trip_stats
+)
+
+# Radiomodus -> (Datensatztyp, Messgröße, Kanalspalte)
+MODES = {"DAB": ("dab", "TL", "F_kHz"), "FM": ("fm", "FS", "FQ_kHz")}
+
+# Start- und Zielraster, über das Fahrten derselben Strecke zugeordnet werden
+ROUTE_CELL_M = 500
+
+TripSet = namedtuple("TripSet", "key frames")
+Partitions = namedtuple("Partitions", "radio positions gnss counts")
+Selection = namedtuple("Selection", "radio gnss freq_counts")
+Alignment = namedtuple("Alignment", "shortest ref_point start_times sorted_sources trips")
+
+class AnalysisEngine:
+    # Die Stufen der Analyseseite ohne Streamlit. Jede Stufe merkt sich ihr Ergebnis
+    # unter den Inhalts-Hashes der Fahrten und den Optionen, ein Rerun mit gleichen
+    # Eingaben rechnet nichts neu. Ergebnisse gelten als unveränderlich.
+    # Partitionen liegen in einem eigenen Cache, damit Stufenergebnisse sie nicht verdrängen
+    def __init__(self, frame_cache=None, result_cache=None, partition_cache=None):
+        self.frame_cache = frame_cache if frame_cache is not None else FrameCache(max_bytes=1 << 30)
+        self.result_cache = result_cache if result_cache is not None else FrameCache(max_bytes=256 << 20)
+        self.partition_cache = partition_cache if partition_cache is not None else FrameCache(max_bytes=512 << 20)
+
+    def load(self, name, content, digest=None):
+        return self.load_stored(name, digest or content_hash(content), lambda: load_frames(name, content))
+
+    def load_stored(self, name, digest, load):
+        # Für bereits gespeicherte Fahrten (z. B. Katalog): load() liefert die Frames ohne Dateiinhalt
+        key = (digest, name)
+        return key, self.frame_cache.get_or_load(key, load)
+
+    def trip_set(self, loaded):
+        # loaded: [(key, frames)] aus load()
+        return TripSet(tuple(key for key, _ in loaded), {key[1]: frames for key, frames in loaded})
+
+    def _memo(self, key, compute):
+        return self.result_cache.get_or_load(key, compute)
+
+    def partitions(self, trips):
+        # Einmal pro Fahrtensatz: Radiodaten je Modus, Zeilenpositionen je Frequenz, GNSS, Frequenzzählung.
+        # Innerhalb jeder Quelle nach Zeit sortiert. Modus- und Frequenzwechsel sind danach nur Nachschlagen
+        def compute():
+            gnss = sort_by_source_time(combine_frames(trips.frames, "gnss"))
+            radio, positions, counts = {}, {}, {}
+            for mode, (typ, _, channel) in MODES.items():
+                df = sort_by_source_time(combine_frames(trips.frames, typ))
+                radio[mode] = df
+                counts[mode] = pd.Series(dtype=int)
+                if channel not in df.columns:
+                    continue
+                groups = df.groupby(channel, sort=True).indices
+                for freq, rows in groups.items():
+                    positions[(mode, int(freq))] = rows
+                counts[mode] = pd.Series({int(freq): len(rows) for freq, rows in groups.items()}, dtype=int)
+            return Partitions(radio, positions, gnss, counts)
+        return self.partition_cache.get_or_load(("partitions", trips.key), compute)
+
+    def selection(self, trips, mode, freq=None):
+        # Radio- und GNSS-Daten aller Fahrten, optional auf eine Frequenz gefiltert
+        parts = self.partitions(trips)
+        radio = parts.radio[mode]
+        if freq is not None:
+            # Einmal je Frequenz ausschneiden, danach ist ein Rerun oder Wechsel nur Nachschlagen.
+            # Positionen sind aufsteigend, die Sortierung nach Quelle und Zeit bleibt erhalten
+            radio = self.partition_cache.get_or_load(
+                ("selection", trips.key, mode, freq),
+                lambda: parts.radio[mode].take(parts.positions.get((mode, freq), [])).reset_index(drop=True)
+            )
+        return Selection(radio, parts.gnss, parts.counts[mode])
+
+    def alignment(self, trips, mode, freq=None):
+        def compute():
+            radio, gnss, _ = self.selection(trips, mode, freq)
+            shortest, ref_point = reference_point(gnss)
+            start_times = trip_start_times(radio, gnss, ref_point)
+            sorted_sources = sorted(start_times, key=lambda k: start_times[k])
+            return Alignment(shortest, ref_point, start_times, sorted_sources, split_trips(radio, start_times))
+        return self._memo(("alignment", trips.key, mode, freq), compute)
+
+    def chart_data(self, trips, mode, freq, resample, by_route=False):
+        # Ausgerichtete und ggf. zeitlich gemittelte Messwerte aller Fahrten in einem DataFrame
+        def compute():
+            metric = MODES[mode][1]
+            gnss = self.selection(trips, mode, freq).gnss
+            aligned = self.alignment(trips, mode, freq)
+            df = aligned.trips
+            columns = [metric, "time_rel"]
+            if by_route:
+                # Alle Fahrten auf die GNSS-Spur der Referenzfahrt snappen
+                ref_gnss = gnss[gnss["source"] == aligned.shortest]
+                route = RouteIndex(ref_gnss["lat"].to_numpy(), ref_gnss["lon"].to_numpy())
+                gnss_by_source = dict(tuple(gnss.groupby("source", sort=False, observed=True)))
+                times = df["timeStamp"].to_numpy()
+                route_pos = np.full(len(df), np.nan)
+                for src, positions in df.groupby("source", sort=False, observed=True).indices.items():
+                    trip_gnss = gnss_by_source.get(src)
+                    if trip_gnss is not None:
+                        route_pos[positions] = route_positions(
+                            route, trip_gnss["timeStamp"], trip_gnss["lat"], trip_gnss["lon"], times[positions]
+                        )
+                df = df.assign(route_pos=route_pos)
+                columns.append("route_pos")
+            return resample_trips(df, columns, resample)
+        return self._memo(("chart_data", trips.key, mode, freq, resample, by_route), compute)
+
+    def trip_stats(self, trips, mode, freq=None):
+        return self._memo(
+            ("trip_stats", trips.key, mode, freq),
+            lambda: trip_stats(self.alignment(trips, mode, freq).trips, MODES[mode][1])
+        )
+
+    def map_data(self, trips, mode, freq=None):
+        # GNSS-Fixes der ausgerichteten Fahrten mit Intervallwerten, Güteklasse und Farbe
+        def compute():
+            metric = MODES[mode][1]
+            radio, gnss, _ = self.selection(trips, mode, freq)
+            sources = self.alignment(trips, mode, freq).sorted_sources
+            gnss = gnss[gnss["source"].isin(sources)]
+            radio = radio[radio["source"].isin(sources)]
+            return assign_colors(gnss, radio, metric, mode == "DAB")
+        return self._memo(("map_data", trips.key, mode, freq), compute)
+
+def sort_by_source_time(df):
+    # Stabil, damit bereits sortierte Dateien ihre Reihenfolge behalten
+    if df.empty:
+        return df
+    return df.sort_values(["source", "timeStamp"], kind="stable").reset_index(drop=True)
+
+def trip_distance_m(gnss):
+    if len(gnss) < 2:
+        return 0.0
+    gnss = gnss.sort_values("timeStamp", kind="stable")
+    lat, lon = gnss["lat"].to_numpy(dtype=float), gnss["lon"].to_numpy(dtype=float)
+    return float(np.nansum(haversine_m(lat[1:], lon[1:], lat[:-1], lon[:-1])))
+
+def route_key(gnss):
+    # Start- und Zielzelle auf einem festen Raster; Fahrten mit gleichem Schlüssel gelten als gleiche Strecke
+    fixes = gnss.dropna(subset=["lat", "lon"]).sort_values("timeStamp", kind="stable")
+    if fixes.empty:
+        return None
+    lat_step = np.degrees(ROUTE_CELL_M / EARTH_RADIUS_M)
+    cells = []
+    for fix in (fixes.iloc[0], fixes.iloc[-1]):
+        lon_step = lat_step / max(np.cos(np.radians(fix["lat"])), 1e-6)
+        cells.append(f"{int(np.floor(fix['lat'] / lat_step))}:{int(np.floor(fix['lon'] / lon_step))}")
+    return "→".join(cells)
+
+def trip_summary(name, frames):
+    # Eine Zeile pro Fahrt, Radiomodus und Kanal
+    gnss = frames["gnss"]
+    trip = {
+        "source": name,
+        "route": route_key(gnss) if not gnss.empty else None,
+        "fixes": len(gnss),
+        "distance_km": round(trip_distance_m(gnss) / 1000, 3) if not gnss.empty else 0.0,
+    }
+    times = [df["timeStamp"] for df in frames.values() if not df.empty]
+    if times:
+        times = pd.concat(times)
+        trip["start"], trip["end"] = times.min(), times.max()
+        trip["duration_s"] = (trip["end"] - trip["start"]).total_seconds()
+
+    rows = []
+    for mode, (typ, metric, channel) in MODES.items():
+        radio = frames[typ]
+        if radio.empty or metric not in radio.columns:
+            continue
+        for freq, values in radio.groupby(channel, sort=True)[metric]:
+            values = values.to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            if not len(values):
+                continue
+            classes = coverage_class(values, mode == "DAB")
+            rows.append({
+                **trip,
+                "mode": mode,
+                "channel_kHz": int(freq),
+                "samples": len(values),
+                "mean": round(float(values.mean()), 2),
+                "min": float(values.min()),
+                "p10": round(float(np.percentile(values, 10)), 2),
+                "max": float(values.max()),
+                "share_good": round(float(np.mean(classes <= 1)), 4),
+                "share_poor": round(float(np.mean(classes == 3)), 4),
+            })
+    return rows or [trip]
+
+def route_summary(trip_table):
+    # Kennzahlen je Strecke, Modus und Kanal über alle zugeordneten Fahrten
+    table = trip_table.dropna(subset=["route", "mode"])
+    if table.empty:
+        return pd.DataFrame()
+    table = table.assign(
+        weighted=table["mean"] * table["samples"],
+        good=table["share_good"] * table["samples"],
+        poor=table["share_poor"] * table["samples"],
+    )
+    routes = table.groupby(["route", "mode", "channel_kHz"], sort=True).agg(
+        trips=("source", "nunique"),
+        samples=("samples", "sum"),
+        weighted=("weighted", "sum"),
+        min=("min", "min"),
+        p10_median=("p10", "median"),
+        max=("max", "max"),
+        good=("good", "sum"),
+        poor=("poor", "sum"),
+        distance_km=("distance_km", "median"),
+    ).reset_index()
+    routes["p10_median"] = routes["p10_median"].round(2)
+    routes["mean"] = (routes.pop("weighted") / routes["samples"]).round(2)
+    routes["share_good"] = (routes.pop("good") / routes["samples"]).round(4)
+    routes["share_poor"] = (routes.pop("poor") / routes["samples"]).round(4)
+    return routes
@@ -0,0 +1,13 @@
+import os
+import sys
+
+# Parser und Eingangsströme des Extraktors (extractor-python/extract.py) direkt nutzen,
+# damit App und Werkzeug dieselbe Klassifizierung und Entpackung verwenden
+EXTRACTOR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "extractor-python")
+if EXTRACTOR_DIR not in sys.path:
+    sys.path.append(EXTRACTOR_DIR)
+
+from extract import (  # noqa: E402
+    classify, columnar_output_path, default_output_path, format_stats, input_compression, iter_entries, open_input,
+    process_file
+)
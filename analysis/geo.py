@@ -0,0 +1,114 @@
+import numpy as np
+
+try:
+    from geopy.distance import geodesic
+except ImportError:
+    geodesic = None
+
+EARTH_RADIUS_M = 6371008.8
+
+# Haversine rechnet auf der Kugel mit mittlerem Erdradius. Gegenüber geopy
+# (WGS84-Ellipsoid) liegt der relative Fehler bei höchstens 0,56 % der
+# Distanz (Pole/Äquator-Extrem), in Mitteleuropa typischerweise unter 0,3 %,
+# d. h. < 1,5 m auf 500 m. Die Schranke bestimmt, welche Kandidaten exakt
+# nachgerechnet werden.
+HAVERSINE_REL_ERROR = 0.0057
+MAX_REFINE_CANDIDATES = 64
+
+def haversine_m(lat, lon, ref_lat, ref_lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    ref_lat, ref_lon = np.radians(ref_lat), np.radians(ref_lon)
+    a = np.sin((lat - ref_lat) / 2) ** 2 + np.cos(lat) * np.cos(ref_lat) * np.sin((lon - ref_lon) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def nearest_index(lat, lon, ref_point, exact=True):
+    # Position des Punkts mit dem geringsten Abstand zu ref_point (lat, lon)
+    ref_lat, ref_lon = float(ref_point[0]), float(ref_point[1])
+    dist = haversine_m(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float), ref_lat, ref_lon)
+    best = int(np.nanargmin(dist))
+
+    if exact and geodesic is not None:
+        # Nur Punkte, die innerhalb der Fehlerschranke noch näher sein könnten, mit geopy nachrechnen
+        bound = dist[best] * (1 + HAVERSINE_REL_ERROR) / (1 - HAVERSINE_REL_ERROR)
+        candidates = np.flatnonzero(dist <= bound)
+        if len(candidates) > MAX_REFINE_CANDIDATES:
+            candidates = np.sort(candidates[np.argsort(dist[candidates], kind="stable")[:MAX_REFINE_CANDIDATES]])
+        if len(candidates) > 1:
+            exact_dist = [geodesic((lat[i], lon[i]), (ref_lat, ref_lon)).meters for i in candidates]
+            best = int(candidates[int(np.argmin(exact_dist))])
+
+    return best
+
+def local_xy(lat, lon, lat0, lon0):
+    # Lokale equirektangulare Projektion in Metern, ausreichend für Strecken bis einige 10 km
+    x = np.radians(np.asarray(lon, dtype=float) - lon0) * EARTH_RADIUS_M * np.cos(np.radians(lat0))
+    y = np.radians(np.asarray(lat, dtype=float) - lat0) * EARTH_RADIUS_M
+    return x, y
+
+class RouteIndex:
+    # Rasterindex über die GNSS-Spur einer Referenzfahrt: Fixes anderer Fahrten
+    # werden auf den nächsten Spurpunkt gesnappt und erhalten dessen Streckenposition
+    def __init__(self, lat, lon, spacing_m=5.0, cell_m=50.0):
+        lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+        self.lat0, self.lon0 = float(np.nanmean(lat)), float(np.nanmean(lon))
+        self.cell_m = cell_m
+
+        x, y = local_xy(lat, lon, self.lat0, self.lon0)
+        ok = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[ok], y[ok]
+        along = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))])
+
+        # Spur auf ~spacing_m ausdünnen, damit Stillstand keine Zellen überfüllt
+        keep = np.unique(np.searchsorted(along, np.arange(0.0, along[-1] + spacing_m, spacing_m)).clip(0, len(along) - 1))
+        self.x, self.y, self.along = x[keep], y[keep], along[keep]
+        self.length_m = float(along[-1])
+
+        keys = self._keys(*self._cells(self.x, self.y))
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def _cells(self, x, y):
+        return np.floor(x / self.cell_m).astype(np.int64), np.floor(y / self.cell_m).astype(np.int64)
+
+    @staticmethod
+    def _keys(cx, cy):
+        return cx * (1 << 31) + cy
+
+    def locate(self, lat, lon, max_dist_m=None):
+        # Streckenposition [m] je Punkt, NaN wenn weiter als max_dist_m von der Spur entfernt
+        max_dist_m = self.cell_m if max_dist_m is None else min(max_dist_m, self.cell_m)
+        qx, qy = local_xy(lat, lon, self.lat0, self.lon0)
+        valid = ~(np.isnan(qx) | np.isnan(qy))
+        qcx, qcy = self._cells(np.where(valid, qx, 0.0), np.where(valid, qy, 0.0))
+
+        best_d2 = np.full(len(qx), np.inf)
+        best = np.full(len(qx), -1, dtype=np.int64)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                keys = self._keys(qcx + dx, qcy + dy)
+                lo = np.searchsorted(self.keys, keys, side="left")
+                hi = np.searchsorted(self.keys, keys, side="right")
+                count = hi - lo
+                # Vektorisiert über alle Abfragen, Schleife nur über die Zellbelegung
+                for j in range(int(count.max(initial=0))):
+                    rows = np.flatnonzero(count > j)
+                    ref = self.order[lo[rows] + j]
+                    d2 = (self.x[ref] - qx[rows]) ** 2 + (self.y[ref] - qy[rows]) ** 2
+                    better = d2 < best_d2[rows]
+                    best_d2[rows[better]] = d2[better]
+                    best[rows[better]] = ref[better]
+
+        position = np.where(best >= 0, self.along[best.clip(0)], np.nan)
+        position[~valid | (best_d2 > max_dist_m ** 2)] = np.nan
+        return position
+
+def route_positions(route, gnss_times, gnss_lat, gnss_lon, times):
+    # Streckenposition für beliebige Zeitpunkte einer Fahrt, linear zwischen den gesnappten Fixes
+    fix_pos = route.locate(gnss_lat, gnss_lon)
+    ok = ~np.isnan(fix_pos)
+    if not ok.any():
+        return np.full(len(times), np.nan)
+    fix_t = np.asarray(gnss_times, dtype="datetime64[ns]").astype(np.int64)[ok]
+    order = np.argsort(fix_t, kind="stable")
+    t = np.asarray(times, dtype="datetime64[ns]").astype(np.int64)
+    return np.interp(t, fix_t[order], fix_pos[ok][order], left=np.nan, right=np.nan)
@@ -0,0 +1,164 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from analysis.extractor import columnar_output_path, default_output_path, process_file
+from analysis.session_store import purge_stale
+
+# Extraktion hochgeladener Rohtraces auf dem Server. Alle Sessions teilen sich einen Pool
+# mit wenigen Prozessen; weitere Aufträge warten in der Reihenfolge des Eingangs.
+# Verzeichnis und Prozesszahl über RADIO_INGEST_DIR / RADIO_INGEST_WORKERS einstellbar
+DEFAULT_DIR = os.environ.get("RADIO_INGEST_DIR", os.path.join(tempfile.gettempdir(), "radio_ingest"))
+DEFAULT_WORKERS = int(os.environ.get("RADIO_INGEST_WORKERS", "2"))
+# Fertige Aufträge samt Ausgaben werden nach einem Tag aufgeräumt
+STALE_AFTER_S = 24 * 3600
+
+WAITING, RUNNING, DONE, FAILED = "wartet", "läuft", "fertig", "fehlgeschlagen"
+
+_progress = None
+
+def _init_worker(progress):
+    global _progress
+    _progress = progress
+
+def extract_job(job_id, input_path, output_path, columnar_path):
+    # Läuft im Worker-Prozess; Fortschritt nur bei Änderung melden, nicht alle 100 Einträge
+    last = [None]
+    def report(percent):
+        if percent != last[0]:
+            last[0] = percent
+            _progress.put((job_id, percent))
+    report(0)
+    return process_file(input_path, output_path, progress_callback=report, columnar_path=columnar_path)
+
+class ExtractedFile:
+    # Ergebnis eines Auftrags; verhält sich in Sessionliste und Analyse wie ein hochgeladenes .rtc
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+    def getvalue(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+class IngestJob:
+    def __init__(self, owner, name, directory):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner = owner
+        self.name = name
+        self.directory = os.path.join(directory, self.id)
+        self.input_path = os.path.join(self.directory, name)
+        self.output_path = default_output_path(self.input_path)
+        self.columnar_path = columnar_output_path(self.output_path)
+        self.state = WAITING
+        self.progress = 0
+        self.submitted = time.time()
+        self.finished_at = None
+        self.stats = None
+        self.error = None
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED)
+
+    def result(self):
+        return ExtractedFile(os.path.basename(self.columnar_path), self.columnar_path)
+
+class IngestQueue:
+    def __init__(self, directory=DEFAULT_DIR, workers=DEFAULT_WORKERS):
+        # Auftragsordner eines früheren Serverlaufs gehören zu keinem Auftrag mehr
+        purge_stale(directory)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.workers = max(workers, 1)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        # Nicht aus dem Streamlit-Server mit seinen Threads forken: Worker starten als frische Prozesse
+        self.context = multiprocessing.get_context("spawn")
+        self.progress = self.context.Queue()
+        self.pool = self._new_pool()
+        threading.Thread(target=self._read_progress, daemon=True).start()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self.context,
+                                   initializer=_init_worker, initargs=(self.progress,))
+
+    def submit(self, owner, name, data):
+        # data: Bytes oder Binärdatei des hochgeladenen Rohtraces, wird sofort auf Platte geschrieben
+        self.purge_stale()
+        job = IngestJob(owner, os.path.basename(name), self.directory)
+        os.makedirs(job.directory)
+        with open(job.input_path, "wb") as f:
+            if isinstance(data, bytes):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f)
+        with self.lock:
+            self.jobs[job.id] = job
+            pool = self.pool
+            future = pool.submit(extract_job, job.id, job.input_path, job.output_path, job.columnar_path)
+        future.add_done_callback(lambda f: self._finish(job, f, pool))
+        return job
+
+    def _finish(self, job, future, pool):
+        job.finished_at = time.time()
+        try:
+            job.stats = future.result()
+            job.state, job.progress = DONE, 100
+        except BrokenProcessPool:
+            job.state, job.error = FAILED, "Extraktionsprozess abgebrochen"
+            # Ein abgestürzter Worker macht den ganzen Pool unbrauchbar; für neue Aufträge ersetzen
+            with self.lock:
+                if self.pool is pool:
+                    self.pool = self._new_pool()
+        except Exception as e:
+            job.state, job.error = FAILED, str(e) or type(e).__name__
+        if job.state == FAILED:
+            # Halb geschriebene Ausgaben nicht liegen lassen
+            for path in (job.output_path, job.columnar_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        # Der Rohtrace wird nach der Extraktion nicht mehr gebraucht
+        if os.path.exists(job.input_path):
+            os.remove(job.input_path)
+
+    def _read_progress(self):
+        while True:
+            job_id, percent = self.progress.get()
+            job = self.jobs.get(job_id)
+            if job and not job.finished:
+                job.state, job.progress = RUNNING, percent
+
+    def jobs_for(self, owner):
+        self.purge_stale()
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return sorted((job for job in jobs if job.owner == owner), key=lambda job: job.submitted)
+
+    def position(self, job):
+        # Wartende Aufträge vor diesem (über alle Sessions)
+        with self.lock:
+            jobs = list(self.jobs.values())
+        return sum(1 for other in jobs if other.state == WAITING and other.submitted < job.submitted)
+
+    def remove(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or not job.finished:
+                return False
+            del self.jobs[job_id]
+        shutil.rmtree(job.directory, ignore_errors=True)
+        return True
+
+    def purge_stale(self):
+        cutoff = time.time() - STALE_AFTER_S
+        with self.lock:
+            stale = [job.id for job in self.jobs.values() if job.finished and job.finished_at < cutoff]
+        for job_id in stale:
+            self.remove(job_id)
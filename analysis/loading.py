@@ -0,0 +1,113 @@
+import io
+import json
+import lzma
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from analysis.columnar import frames_from_columnar, is_columnar
+from analysis.extractor import classify, input_compression, iter_entries, open_input
+
+RECORD_TYPES = ["dab", "fm", "gnss"]
+
+# Spaltentypen wie im Spaltenformat (.rtc): JSON, .rtc und Katalog liefern identische Frames
+COLUMN_DTYPES = {
+    "dab": {"F_kHz": "int32", "TL": "int16", "SNR": "int16"},
+    "fm": {"FQ_kHz": "int32", "FS": "int16", "SNR": "int16"},
+    "gnss": {"ts": "float64", "lat": "float64", "lon": "float64", "hdg": "float32", "fix": "int16", "antenna": "int16"},
+}
+
+def typed_column(values, dtype):
+    try:
+        return np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError, OverflowError):
+        # Fehlende oder nicht numerische Werte (z. B. hdg "n/a") werden NaN, Ganzzahlen dann float
+        values = pd.to_numeric(pd.Series(values), errors="coerce")
+        return values.to_numpy(dtype=dtype if np.dtype(dtype).kind == "f" else "float64")
+
+def timestamp_column(values):
+    # Der Extraktor schreibt Epoch-Millisekunden: direkt nach datetime64, ohne String-Parsing
+    try:
+        return np.asarray(values, dtype=np.int64).astype("datetime64[ms]").astype("datetime64[ns]")
+    except (TypeError, ValueError, OverflowError):
+        pass
+    # Ältere Ausgaben mit ISO-Strings, nicht lesbare Zeiten (None) oder beides gemischt
+    values = [np.datetime64(value, "ms") if type(value) is int else value for value in values]
+    return naive_utc(values)
+
+def naive_utc(values):
+    # Zeiten mit Zone ("...Z", "+02:00") nach UTC umrechnen und wie der Extraktor ohne Zone führen
+    times = pd.DatetimeIndex(pd.to_datetime(values, utc=True, format="ISO8601"))
+    return times.tz_localize(None).astype("datetime64[ns]")
+
+def source_column(name, n):
+    # Eine Kategorie pro Datei statt eines Strings pro Zeile
+    return pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[name])
+
+def compact_frame(df, typ, name):
+    if df["timeStamp"].dtype != "datetime64[ns]":
+        df["timeStamp"] = naive_utc(df["timeStamp"]).to_numpy()
+    for column, dtype in COLUMN_DTYPES[typ].items():
+        if column in df.columns and df[column].dtype != dtype:
+            df[column] = typed_column(df[column], dtype)
+    df["source"] = source_column(name, len(df))
+    return df
+
+def frames_from_entries(entries, name):
+    # Extrahierte Datensätze direkt übernehmen, Rohtrace-Einträge (msgData) wie im Extraktor klassifizieren
+    groups = {typ: [] for typ in RECORD_TYPES}
+    for entry in entries:
+        if "type" not in entry:
+            entry = classify(entry) if "msgData" in entry else None
+            if entry is None:
+                continue
+        if entry.get("type") in groups:
+            groups[entry["type"]].append(entry)
+
+    # Spaltenweise mit festen Typen aufbauen statt pd.DataFrame(list_of_dicts)
+    frames = {}
+    for typ, entries in groups.items():
+        if not entries:
+            frames[typ] = pd.DataFrame()
+            continue
+        dtypes = COLUMN_DTYPES[typ]
+        extra = [key for key in entries[0] if key not in dtypes and key not in ("type", "timeStamp")]
+        data = {"timeStamp": timestamp_column([entry.get("timeStamp") for entry in entries])}
+        for column, dtype in dtypes.items():
+            data[column] = typed_column([entry.get(column) for entry in entries], dtype)
+        for column in extra:
+            data[column] = [entry.get(column) for entry in entries]
+        data["source"] = source_column(name, len(entries))
+        frames[typ] = pd.DataFrame(data)
+    return frames
+
+def frames_from_json(content, name):
+    return frames_from_entries(json.loads(content), name)
+
+def frames_from_compressed(content, name):
+    # .gz/.bz2/.xz/.zip werden beim Lesen entpackt und Eintrag für Eintrag geparst,
+    # der entpackte Text liegt nie vollständig im Speicher
+    try:
+        with open_input(io.BytesIO(content)) as (stream, _):
+            return frames_from_entries(iter_entries(stream), name)
+    except (OSError, EOFError, lzma.LZMAError, zipfile.BadZipFile) as e:
+        raise ValueError(f"Archiv '{name}' ist beschädigt: {e}") from e
+
+def load_frames(name, content):
+    # Liefert pro Datei typisierte DataFrames für DAB, FM und GNSS
+    if is_columnar(content):
+        frames = frames_from_columnar(content, name)
+    elif input_compression(content):
+        frames = frames_from_compressed(content, name)
+    else:
+        frames = frames_from_json(content, name)
+
+    for typ in RECORD_TYPES:
+        frames.setdefault(typ, pd.DataFrame())
+    return frames
+
+def load_file(path):
+    with open(path, "rb") as f:
+        return load_frames(os.path.basename(path), f.read())
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+def minmax_indices(x, y, max_points):
+    # Min/Max-Dezimierung: pro x-Bucket bleiben Minimum und Maximum erhalten,
+    # damit kurze Einbrüche auch bei wenigen Punkten sichtbar bleiben
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n)
+
+    buckets = max(max_points // 2, 1)
+    lo, span = x.min(), x.max() - x.min()
+    if span > 0:
+        bucket = ((x - lo) / span * buckets).astype(np.int64).clip(0, buckets - 1)
+    else:
+        bucket = np.zeros(n, dtype=np.int64)
+
+    order = np.lexsort((y, bucket))
+    sorted_bucket = bucket[order]
+    first = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+    last = np.r_[first[1:] - 1, n - 1]
+    return np.unique(np.concatenate([order[first], order[last], [0, n - 1]]))
+
+def decimate(df, x_field, y_field, max_points, by="source"):
+    parts = []
+    for _, group in df.groupby(by, sort=False, observed=True):
+        group = group.sort_values(x_field, kind="stable")
+        parts.append(group.iloc[minmax_indices(group[x_field].to_numpy(), group[y_field].to_numpy(), max_points)])
+    return pd.concat(parts, ignore_index=True) if parts else df
+
+def window(df, x_field, x_range):
+    lo, hi = x_range
+    return df[(df[x_field] >= lo) & (df[x_field] <= hi)]
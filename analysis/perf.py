@@ -0,0 +1,60 @@
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Stufenmessung für die Analyse: Laufzeit, Zeilen und (optional) allozierter Speicher.
+# Jede Stufe wird zusätzlich als JSON-Logzeile geschrieben, wie process_file im Extractor.
+logger = logging.getLogger("radioanalyse.perf")
+
+# Level der Logzeilen in der App über RADIO_LOG_LEVEL (Standard INFO, z. B. WARNING schaltet sie ab)
+LOG_LEVEL = os.environ.get("RADIO_LOG_LEVEL", "INFO").upper()
+
+def configure_logging():
+    # Streamlit richtet für eigene Logger nichts ein: einmal pro Prozess einen Handler nach stderr anhängen,
+    # gleiches Format wie der Extractor auf der Kommandozeile. Mehrfache Aufrufe (Reruns) ändern nichts.
+    app_logger = logging.getLogger("radioanalyse")
+    app_logger.setLevel(LOG_LEVEL)
+    if not any(getattr(handler, "radioanalyse", False) for handler in app_logger.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(name)s %(message)s"))
+        handler.radioanalyse = True
+        app_logger.addHandler(handler)
+        app_logger.propagate = False
+
+def start_memory_trace():
+    # tracemalloc gilt prozessweit und bremst alle Sessions - nur bei Bedarf einschalten
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def stop_memory_trace():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+class StageRecorder:
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        # Über das gelieferte dict können Zeilenzahlen auch nachträglich gesetzt werden
+        info = {"rows": rows}
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            mem_start = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield info
+        finally:
+            record = {"stage": name, "seconds": round(time.perf_counter() - started, 4), "rows": info["rows"]}
+            if tracing and tracemalloc.is_tracing():
+                record["alloc_mb"] = round((tracemalloc.get_traced_memory()[1] - mem_start) / 2**20, 2)
+            self.records.append(record)
+            logger.info(json.dumps({**self.context, **record}))
+
+    def total_seconds(self):
+        return round(sum(r["seconds"] for r in self.records), 4)
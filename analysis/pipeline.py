@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from analysis.geo import nearest_index
+
+# Einzelne Verarbeitungsschritte der Analyse-Seite, ohne Streamlit nutzbar
+
+def combine_frames(trip_frames, typ):
+    parts = [frames[typ] for frames in trip_frames.values() if not frames[typ].empty]
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat(parts, ignore_index=True)
+    # concat macht aus Kategorien mit unterschiedlichen Werten object - Quelle kategorial halten
+    df["source"] = union_categoricals([pd.Categorical(p["source"]) for p in parts])
+    return df
+
+def frequency_counts(radio_df):
+    return radio_df["F_kHz"].value_counts().sort_index()
+
+def reference_point(gnss_df):
+    # Erster Fix der Fahrt mit den wenigsten GNSS-Punkten
+    shortest = gnss_df.groupby("source").size().idxmin()
+    ref_point = gnss_df[gnss_df["source"] == shortest].iloc[0][["lat", "lon"]].values
+    return shortest, ref_point
+
+def get_start_timestamp_near_ref(gnss_df, source, ref_point):
+    df = gnss_df[gnss_df["source"] == source]
+    return start_timestamp_near_ref(df, ref_point)
+
+def start_timestamp_near_ref(trip_gnss, ref_point):
+    nearest = nearest_index(trip_gnss["lat"].to_numpy(), trip_gnss["lon"].to_numpy(), ref_point)
+    return trip_gnss["timeStamp"].iloc[nearest]
+
+def trip_start_times(radio_df, gnss_df, ref_point):
+    # Je Quelle der erste Radiowert ab dem Fix, der dem Referenzpunkt am nächsten liegt.
+    # radio_df muss innerhalb jeder Quelle nach timeStamp sortiert sein.
+    # Ein groupby-Durchlauf statt einer Maske über den ganzen Frame pro Fahrt
+    gnss_by_source = dict(tuple(gnss_df.groupby("source", sort=False, observed=True)))
+    start_times = {}
+    for src, sub_radio in radio_df.groupby("source", sort=False, observed=True):
+        times = sub_radio["timeStamp"]
+        trip_gnss = gnss_by_source.get(src)
+        if trip_gnss is None or trip_gnss.empty:
+            start_times[src] = times.iloc[0]
+            continue
+        # Zeiten je Quelle aufsteigend (siehe AnalysisEngine.partitions): Binärsuche statt Maske
+        i = int(times.searchsorted(start_timestamp_near_ref(trip_gnss, ref_point)))
+        start_times[src] = times.iloc[i] if i < len(times) else times.iloc[0]
+    return start_times
+
+def split_trips(radio_df, start_times):
+    # Alle Fahrten in einem Durchlauf: jede Fahrt ab ihrem Start bis zum Ende ihrer Quelle.
+    # Ergebnis ist ein Frame mit time_rel, nach Startzeit sortiert; source ist kategorial
+    # in dieser Reihenfolge. Zeitlich überlappende Fahrten (mehrere Fahrzeuge) bleiben vollständig.
+    sorted_sources = sorted(start_times, key=lambda k: start_times[k])
+    if not sorted_sources or radio_df.empty:
+        return pd.DataFrame(columns=list(radio_df.columns) + ["time_rel"])
+    starts = np.array([start_times[s] for s in sorted_sources], dtype="datetime64[ns]")
+
+    codes = pd.Categorical(radio_df["source"], categories=sorted_sources, ordered=True).codes
+    trip_start = starts[codes.clip(0)]
+    times = radio_df["timeStamp"].to_numpy(dtype="datetime64[ns]")
+    keep = (codes >= 0) & (times >= trip_start)
+
+    # stabil nach Fahrt sortieren, innerhalb der Fahrt bleibt die Dateireihenfolge
+    order = np.flatnonzero(keep)
+    order = order[np.argsort(codes[order], kind="stable")]
+    trips = radio_df.iloc[order].reset_index(drop=True)
+    trips["source"] = pd.Categorical.from_codes(codes[order], categories=sorted_sources, ordered=True)
+    trips["time_rel"] = (times[order] - trip_start[order]) / np.timedelta64(1, "s")
+    return trips
+
+def resample_trips(trips, columns, resample):
+    # Mittelwerte pro Fahrt und Zeitintervall in einem gruppierten Durchlauf
+    if resample in ("Original", "Adaptiv (LOD)"):
+        out = trips[["timeStamp", "source"] + columns]
+    else:
+        out = trips.groupby(["source", pd.Grouper(key="timeStamp", freq=resample)], observed=True, sort=True)[columns].mean()
+        out = out.reset_index()
+    return out.dropna(subset=columns).reset_index(drop=True)
+
+def trip_stats(trips, metric):
+    # Kennzahlen je Fahrt für die Vergleichstabelle
+    grouped = trips.groupby("source", observed=True, sort=True)
+    stats = grouped[metric].describe(percentiles=[0.1, 0.5, 0.9])
+    stats = stats.rename(columns={"count": "Werte", "mean": "Mittel", "std": "Std", "min": "Min", "10%": "P10",
+                                  "50%": "Median", "90%": "P90", "max": "Max"})
+    stats["Start"] = grouped["timeStamp"].min()
+    stats["Dauer [s]"] = grouped["time_rel"].max().round(1)
+    stats["Werte"] = stats["Werte"].astype(int)
+    numeric = ["Mittel", "Std", "Min", "P10", "Median", "P90", "Max"]
+    stats[numeric] = stats[numeric].round(1)
+    return stats[["Start", "Dauer [s]", "Werte"] + numeric]
+
+def percentile_band(df, x_field, y_field, bins=200, quantiles=(0.1, 0.5, 0.9)):
+    # Flottenband: x in gleich breite Abschnitte teilen, je Fahrt mitteln und dann über
+    # alle Fahrten die Quantile bilden - jede Fahrt zählt gleich, egal wie dicht sie misst
+    data = df[[x_field, y_field, "source"]].dropna()
+    if data.empty:
+        return pd.DataFrame(columns=["x", "low", "median", "high", "trips"])
+    x = data[x_field].to_numpy(dtype=float)
+    lo, hi = float(x.min()), float(x.max())
+    width = (hi - lo) / bins if hi > lo else 1.0
+    data = data.assign(bin=np.minimum(((x - lo) / width).astype(np.int64), bins - 1))
+
+    per_trip = data.groupby(["bin", "source"], observed=True, sort=False)[y_field].mean().reset_index()
+    grouped = per_trip.groupby("bin", sort=True)[y_field]
+    band = grouped.quantile(list(quantiles)).unstack()
+    band.columns = ["low", "median", "high"]
+    band["trips"] = grouped.size()
+    band["x"] = lo + (band.index.to_numpy() + 0.5) * width
+    return band.reset_index(drop=True)[["x", "low", "median", "high", "trips"]]
@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import weakref
+
+from analysis.cache import FrameCache, content_hash
+
+# Hochgeladene Dateien einer Session liegen auf der Platte statt als UploadedFile im RAM.
+# Im Speicher bleibt nur ein LRU-Hot-Set bis zum Budget; Verzeichnis und Budget in MB über
+# RADIO_SESSION_DIR / RADIO_SESSION_HOT_MB einstellbar
+DEFAULT_DIR = os.environ.get("RADIO_SESSION_DIR", os.path.join(tempfile.gettempdir(), "radio_sessions"))
+DEFAULT_HOT_MB = int(os.environ.get("RADIO_SESSION_HOT_MB", "128"))
+STALE_AFTER_S = 24 * 3600
+
+class StoredFile:
+    # Eintrag in st.session_state.uploaded_files; Digest steht fest, ohne die Datei erneut zu lesen
+    def __init__(self, store, name, path, digest, size):
+        self.store = store
+        self.name = name
+        self.path = path
+        self.digest = digest
+        self.size = size
+
+    def getvalue(self):
+        return self.store.read(self)
+
+class SessionStore:
+    def __init__(self, directory=DEFAULT_DIR, hot_mb=DEFAULT_HOT_MB):
+        purge_stale(directory)
+        self.directory = os.path.join(directory, uuid.uuid4().hex)
+        os.makedirs(self.directory)
+        self.hot = FrameCache(max_bytes=hot_mb << 20)
+        self.files = {}
+        # Endet die Session, verschwindet der Store aus session_state - dann auch die Dateien
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.directory, True)
+
+    def add(self, name, data):
+        # data: Bytes des Uploads; gleicher Name und Inhalt wird nur einmal gespeichert
+        self.touch()
+        digest = content_hash(data)
+        path = os.path.join(self.directory, f"{digest[:16]}_{os.path.basename(name)}")
+        if path not in self.files:
+            with open(path, "wb") as f:
+                f.write(data)
+            self.files[path] = StoredFile(self, name, path, digest, len(data))
+        self._keep_hot(path, bytes(data))
+        return self.files[path]
+
+    def touch(self):
+        # Aktive Sessions gelten für purge_stale nicht als verwaist; fehlt das Verzeichnis doch, neu anlegen
+        os.makedirs(self.directory, exist_ok=True)
+        os.utime(self.directory)
+
+    def read(self, file):
+        self.touch()
+        data = self.hot.get(file.path)
+        if data is None:
+            try:
+                data = read_bytes(file.path)
+            except FileNotFoundError:
+                # Von außen gelöscht (z. B. aufgeräumt): aus dem Store nehmen, der Aufrufer meldet es
+                self.files.pop(file.path, None)
+                raise
+            self._keep_hot(file.path, data)
+        return data
+
+    def _keep_hot(self, path, data):
+        # Dateien über dem Budget werden nur gelesen, nicht gehalten
+        if len(data) <= self.hot.max_bytes:
+            self.hot.put(path, data)
+
+    def remove(self, file):
+        if self.files.pop(file.path, None) is not None:
+            self.hot.discard(file.path)
+            os.remove(file.path)
+
+    def usage(self):
+        return {
+            "files": len(self.files),
+            "disk_bytes": sum(file.size for file in self.files.values()),
+            "hot_files": len(self.hot),
+            "hot_bytes": self.hot.nbytes,
+            "hot_budget": self.hot.max_bytes,
+        }
+
+    def close(self):
+        self._cleanup()
+
+def get_session_store(session_state):
+    # Pro Session ein Plattenspeicher für Uploads, im RAM nur das Hot-Set. Bei jedem Rerun aufrufen:
+    # das hält das Verzeichnis frisch, auch solange nur gecachte Frames genutzt werden
+    if "session_store" not in session_state:
+        session_state.session_store = SessionStore()
+    store = session_state.session_store
+    store.touch()
+    return store
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def purge_stale(directory):
+    # Reste von Sessions, die ohne Aufräumen endeten (z. B. Serverneustart)
+    if not os.path.isdir(directory):
+        return
+    cutoff = time.time() - STALE_AFTER_S
+    for entry in os.scandir(directory):
+        if entry.is_dir() and entry.stat().st_mtime < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
@@ -0,0 +1,72 @@
+import argparse
+import gc
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "extractor-python"))
+import extract
+import tracegen
+
+# Stand vor der Regeltabelle: drei Substring-Prüfungen plus unkompiliertes re.search pro Nachricht
+# (timeStamp wie heute als Epoch-Millisekunden, damit beide dasselbe liefern)
+def legacy_records(data):
+    combined = []
+    for entry in data:
+        msg = entry.get("msgData", "")
+        if "MER_NXP_MOD# QUAL" in msg and "isAudio=1" in msg:
+            match = re.search(r"F=(\d+)\s+EQ=.*?TL=(-?\d+)\s+SNR=(\d+)", msg)
+            if match:
+                f, tl, snr = match.groups()
+                combined.append({"type": "dab", "timeStamp": extract.parse_timestamp(entry.get("timeStamp")), "F_kHz": int(f), "TL": int(tl), "SNR": int(snr)})
+        elif "T[1/0x231]" in msg:
+            match = re.search(r"fq (\d+), fs (\d+), .*?snr (\d+)", msg)
+            if match:
+                fq, fs, snr = match.groups()
+                combined.append({"type": "fm", "timeStamp": extract.parse_timestamp(entry.get("timeStamp")), "FQ_kHz": int(fq), "FS": int(fs), "SNR": int(snr)})
+        elif "TRK-GNSS" in msg:
+            match = re.search(r"ts=([\d\.]+), pos=\(([-\d\.]+), ([-\d\.]+),.*?\), hdg=([\-\w\.]+), fix=(\d+), antenna=(\d+)", msg)
+            if match:
+                ts, lat, lon, hdg, fix, antenna = match.groups()
+                combined.append({"type": "gnss", "timeStamp": extract.parse_timestamp(entry.get("timeStamp")), "ts": float(ts), "lat": float(lat),
+                                 "lon": float(lon), "hdg": hdg, "fix": int(fix), "antenna": int(antenna)})
+    return combined
+
+def rule_table_records(data):
+    return list(extract.iter_records(data))
+
+def measure(func, data, repeat):
+    best = min(_timed(func, data) for _ in range(repeat))
+    return {"seconds": round(best, 4), "entries_per_sec": round(len(data) / best)}
+
+def _timed(func, data):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func(data)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+def main():
+    parser = argparse.ArgumentParser(description="Durchsatz: Regeltabelle gegen die alte if/elif-Kette")
+    parser.add_argument("-n", "--entries", type=int, default=200_000)
+    parser.add_argument("-r", "--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    data = list(tracegen.iter_trace(args.entries))
+    assert legacy_records(data) == rule_table_records(data)
+
+    result = {
+        "entries": args.entries,
+        "legacy": measure(legacy_records, data, args.repeat),
+        "rule_table": measure(rule_table_records, data, args.repeat),
+    }
+    result["speedup"] = round(result["legacy"]["seconds"] / result["rule_table"]["seconds"], 2)
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
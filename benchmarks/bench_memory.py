@@ -0,0 +1,56 @@
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "extractor-python"))
+import extract
+import tracegen
+from analysis.binning import CLASS_NAMES, PALETTE, assign_colors, bin_radio_to_gnss, coverage_class
+from analysis.loading import frames_from_entries
+
+# Stand vor den typisierten Frames: pd.DataFrame(list_of_dicts), source als String, Farbe als Liste pro Zeile
+def legacy_frames(records, name):
+    frames = {}
+    for typ in ("dab", "fm", "gnss"):
+        df = pd.DataFrame([r for r in records if r["type"] == typ]).drop(columns="type")
+        df["timeStamp"] = pd.to_datetime(df["timeStamp"], unit="ms")
+        df["source"] = name
+        frames[typ] = df
+    frames["gnss"]["hdg"] = pd.to_numeric(frames["gnss"]["hdg"], errors="coerce")
+    return frames
+
+def legacy_colors(frames):
+    df = bin_radio_to_gnss(frames["gnss"], frames["dab"], "TL")
+    classes = coverage_class(df["TL"].to_numpy(), True)
+    df["coverage"] = pd.Categorical.from_codes(classes, CLASS_NAMES)
+    df["color"] = PALETTE[classes].tolist()
+    return df
+
+def frame_bytes(frames):
+    return {typ: int(df.memory_usage(deep=True).sum()) for typ, df in frames.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Speicherbedarf: typisierte Frames gegen pd.DataFrame(list_of_dicts)")
+    parser.add_argument("-n", "--entries", type=int, default=500_000)
+    args = parser.parse_args()
+
+    name = "fahrt_01_extracted.json"
+    records = list(extract.iter_records(tracegen.iter_trace(args.entries)))
+    legacy = legacy_frames(records, name)
+    typed = frames_from_entries(records, name)
+
+    legacy["map"] = legacy_colors(legacy)
+    typed["map"] = assign_colors(typed["gnss"], typed["dab"], "TL", True)
+    result = {"entries": args.entries, "legacy": frame_bytes(legacy), "typed": frame_bytes(typed)}
+    for key in ("legacy", "typed"):
+        result[key]["total"] = sum(result[key].values())
+    result["ratio"] = round(result["legacy"]["total"] / result["typed"]["total"], 2)
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "extractor-python"))
+import extract
+import tracegen
+from analysis.loading import timestamp_column
+
+# Zeitstempel einer Fahrt mit n Datensätzen im 20-ms-Takt: vorher reichte der Extraktor die
+# ISO-Strings unverändert durch und die Analyse parste sie (pd.to_datetime mit Formaterkennung),
+# jetzt parst der Extraktor einmal per datetime.fromisoformat nach Epoch-ms
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, round(best, 4)
+
+def main():
+    parser = argparse.ArgumentParser(description="Zeitstempel: ISO-Strings gegen Epoch-Millisekunden")
+    parser.add_argument("-n", "--rows", type=int, default=1_000_000)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start_ms = tracegen.START_EPOCH_S * 1000
+    strings = [tracegen._timestamp(start_ms + i * tracegen.TICK_MS) for i in range(args.rows)]
+    result = {"rows": args.rows, "before": {}, "after": {}}
+
+    # Extraktor: vorher Durchreichen des Strings aus dem Rohtrace-Eintrag, jetzt Parsen pro Datensatz
+    entries = [{"timeStamp": v} for v in strings]
+    _, result["before"]["extract"] = timed(lambda: [entry.get("timeStamp") for entry in entries], args.repeat)
+    ints, result["after"]["extract"] = timed(
+        lambda: [extract.parse_timestamp(entry.get("timeStamp")) for entry in entries], args.repeat
+    )
+
+    # JSON der extrahierten Datei einlesen
+    string_json, int_json = json.dumps(strings), json.dumps(ints)
+    result["before"]["json_bytes"], result["after"]["json_bytes"] = len(string_json), len(int_json)
+    _, result["before"]["json_loads"] = timed(lambda: json.loads(string_json), args.repeat)
+    _, result["after"]["json_loads"] = timed(lambda: json.loads(int_json), args.repeat)
+
+    # Analyse: Spalte nach datetime64
+    before, result["before"]["to_datetime"] = timed(lambda: pd.to_datetime(strings).astype("datetime64[ns]"), args.repeat)
+    after, result["after"]["to_datetime"] = timed(lambda: timestamp_column(ints), args.repeat)
+    assert (before.to_numpy() == after).all()
+
+    # Die Extraktion läuft einmal pro Trace, die Analyse bei jedem Laden - beides getrennt und zusammen ausweisen
+    for key in ("before", "after"):
+        result[key]["analysis_seconds"] = round(result[key]["json_loads"] + result[key]["to_datetime"], 4)
+        result[key]["total_seconds"] = round(result[key]["extract"] + result[key]["analysis_seconds"], 4)
+    result["analysis_speedup"] = round(result["before"]["analysis_seconds"] / result["after"]["analysis_seconds"], 2)
+    result["total_speedup"] = round(result["before"]["total_seconds"] / result["after"]["total_seconds"], 2)
+    print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
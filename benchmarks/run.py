@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "extractor-python"))
+
+import extract
+import tracegen
+from analysis.binning import assign_colors
+from analysis.loading import load_frames
+from analysis.pipeline import (
+    combine_frames, frequency_counts, percentile_band, reference_point, resample_trips, split_trips, trip_start_times
+)
+
+# Headless-Benchmark: Extraktion und alle Stufen der Analyse-Seite auf mehreren
+# synthetischen Fahrten derselben Strecke (Standard: zwei). Ausgabe als JSON, vergleichbar per --baseline.
+
+def measure(func, memory=True):
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    stats = {"seconds": round(seconds, 4)}
+
+    if memory:
+        # Eigener Durchlauf, damit tracemalloc die Zeitmessung nicht verfälscht
+        tracemalloc.start()
+        func()
+        stats["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+    return result, stats
+
+def add_rows(stats, rows):
+    stats["rows"] = int(rows)
+    stats["rows_per_sec"] = round(rows / stats["seconds"]) if stats["seconds"] else None
+    return stats
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def run(entries, workdir, workers=1, memory=True, trips=2):
+    stages = {}
+    # Fahrten derselben Strecke an aufeinanderfolgenden Tagen, abwechselnd schneller und langsamer
+    traces = {
+        f"fahrt_{i + 1:02d}.json": dict(seed=i + 1, speed_mps=14.0 if i % 2 == 0 else 11.0,
+                                        start_epoch_s=tracegen.START_EPOCH_S + i * 86400)
+        for i in range(max(trips, 2))
+    }
+    outputs = {}
+    for name, kwargs in traces.items():
+        path = os.path.join(workdir, name)
+        tracegen.write_trace(path, entries, **kwargs)
+        outputs[name] = (path, path.replace(".json", "_extracted.json"), path.replace(".json", "_extracted.rtc"))
+
+    raw_path, json_path, rtc_path = outputs["fahrt_01.json"]
+    raw_bytes = os.path.getsize(raw_path)
+    _, stats = measure(lambda: extract.process_file(raw_path, json_path), memory)
+    stages["extract"] = add_rows(stats, entries)
+    stats["mb_per_sec"] = round(raw_bytes / 2**20 / stats["seconds"], 2)
+    _, stats = measure(lambda: extract.process_file(raw_path, json_path, columnar_path=rtc_path), memory)
+    stages["extract_columnar"] = add_rows(stats, entries)
+    if workers > 1:
+        _, stats = measure(lambda: extract.process_file(raw_path, json_path, workers=workers), memory)
+        stages[f"extract_parallel_{workers}"] = add_rows(stats, entries)
+    for name, (raw_path_b, json_path_b, rtc_path_b) in outputs.items():
+        if name != "fahrt_01.json":
+            extract.process_file(raw_path_b, json_path_b, columnar_path=rtc_path_b)
+
+    contents = {os.path.basename(p[1]): open(p[1], "rb").read() for p in outputs.values()}
+    trip_frames, stats = measure(lambda: {name: load_frames(name, data) for name, data in contents.items()}, memory)
+    records = sum(len(df) for frames in trip_frames.values() for df in frames.values())
+    stages["load_json"] = add_rows(stats, records)
+    stats["mb"] = round(sum(map(len, contents.values())) / 2**20, 2)
+
+    columnar = {os.path.basename(p[2]): open(p[2], "rb").read() for p in outputs.values()}
+    _, stats = measure(lambda: {name: load_frames(name, data) for name, data in columnar.items()}, memory)
+    stages["load_columnar"] = add_rows(stats, records)
+    stats["mb"] = round(sum(map(len, columnar.values())) / 2**20, 2)
+
+    def select():
+        radio_df = combine_frames(trip_frames, "dab")
+        freq = frequency_counts(radio_df).idxmax()
+        return radio_df[radio_df["F_kHz"] == freq], combine_frames(trip_frames, "gnss")
+    (radio_df, gnss_df), stats = measure(select, memory)
+    stages["filter"] = add_rows(stats, len(radio_df) + len(gnss_df))
+
+    def align():
+        _, ref_point = reference_point(gnss_df)
+        return trip_start_times(radio_df, gnss_df, ref_point)
+    start_times, stats = measure(align, memory)
+    stages["alignment"] = add_rows(stats, len(gnss_df))
+
+    def resample():
+        return resample_trips(split_trips(radio_df, start_times), ["TL", "time_rel"], "5s")
+    chart_df, stats = measure(resample, memory)
+    stages["resample"] = add_rows(stats, len(radio_df))
+
+    _, stats = measure(lambda: percentile_band(chart_df, "time_rel", "TL"), memory)
+    stages["percentile_band"] = add_rows(stats, len(chart_df))
+
+    _, stats = measure(lambda: assign_colors(gnss_df, radio_df, "TL", True), memory)
+    stages["assign_colors"] = add_rows(stats, len(gnss_df) + len(radio_df))
+
+    return stages
+
+def compare(result, baseline):
+    lines = [f"{'Stufe':<22}{'vorher [s]':>12}{'jetzt [s]':>12}{'Faktor':>9}"]
+    for name, stats in result["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if not old:
+            continue
+        factor = old["seconds"] / stats["seconds"] if stats["seconds"] else float("inf")
+        lines.append(f"{name:<22}{old['seconds']:>12.3f}{stats['seconds']:>12.3f}{factor:>8.2f}x")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für Extraktion und Analyse")
+    parser.add_argument("-n", "--entries", type=int, default=100_000, help="Rohtrace-Einträge pro Fahrt (10k bis 10M)")
+    parser.add_argument("-t", "--trips", type=int, default=2, help="Anzahl Fahrten derselben Strecke (Standard: 2)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Zusätzlich parallele Extraktion messen")
+    parser.add_argument("--no-memory", action="store_true", help="Spitzenspeicher nicht messen (halbiert die Laufzeit)")
+    parser.add_argument("--out", help="Ergebnis zusätzlich als JSON-Datei speichern")
+    parser.add_argument("--baseline", help="Früheres Ergebnis zum Vergleich")
+    parser.add_argument("--workdir", help="Verzeichnis für die erzeugten Traces (Standard: temporär)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        stages = run(args.entries, workdir, workers=args.workers, memory=not args.no_memory, trips=args.trips)
+
+    result = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "entries_per_trip": args.entries,
+            "trips": max(args.trips, 2),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "stages": stages,
+    }
+    print(json.dumps(result, indent=2))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            print(compare(result, json.load(f)), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import json
+import math
+import random
+import time
+
+# Deterministischer Generator für Rohtraces im Format, das extract.py auswertet.
+# Pro 20-ms-Takt entsteht genau ein Eintrag; DAB/FM/GNSS/Rauschen im festen Verhältnis.
+
+DAB_FREQUENCIES = [178352, 202928]
+FM_FREQUENCY = 98500
+TICK_MS = 20
+START_EPOCH_S = 1713168000  # 2024-04-15 08:00:00 UTC
+
+def _timestamp(epoch_ms):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(epoch_ms // 1000)) + f".{epoch_ms % 1000:03d}"
+
+def route_point(distance_m, origin=(48.1, 11.5)):
+    # Geschwungene Strecke nach Nordosten, gleiche Geometrie für alle Fahrten
+    north = distance_m * 0.6 + 150 * math.sin(distance_m / 900)
+    east = distance_m * 0.8 + 120 * math.cos(distance_m / 700)
+    return origin[0] + north / 111_195, origin[1] + east / (111_195 * math.cos(math.radians(origin[0])))
+
+def iter_trace(n, seed=0, start_epoch_s=START_EPOCH_S, speed_mps=14.0):
+    rng = random.Random(seed)
+    for i in range(n):
+        epoch_ms = start_epoch_s * 1000 + i * TICK_MS
+        distance = speed_mps * i * TICK_MS / 1000
+        level = math.sin(distance / 1500) + 0.4 * math.sin(distance / 170)
+        slot = i % 10
+
+        if slot in (0, 5):
+            tl = int(-62 + 22 * level + rng.gauss(0, 3))
+            msg = (f"MER_NXP_MOD# QUAL isAudio={int(rng.random() < 0.97)} F={DAB_FREQUENCIES[slot // 5]} "
+                   f"EQ=0x{rng.randrange(256):02x} FIC=0 TL={tl} SNR={max(0, int(18 + 8 * level + rng.gauss(0, 2)))}")
+        elif slot in (2, 7):
+            msg = (f"T[1/0x231] tuner quality: fq {FM_FREQUENCY}, fs {max(0, int(45 + 20 * level + rng.gauss(0, 3)))}, "
+                   f"mp {rng.randrange(20)}, adj {rng.randrange(20)}, snr {max(0, int(25 + 10 * level))}")
+        elif slot == 4 and i % 50 == 4:
+            lat, lon = route_point(distance)
+            msg = (f"TRK-GNSS ts={epoch_ms / 1000:.3f}, pos=({lat:.7f}, {lon:.7f}, {520 + 5 * level:.1f}), "
+                   f"hdg={rng.uniform(0, 360):.1f}, fix=3, antenna=1")
+        else:
+            msg = f"APP[{rng.randrange(64)}] state update seq={i} payload=" + "ab" * rng.randrange(4, 40)
+
+        yield {"timeStamp": _timestamp(epoch_ms), "level": 3, "msgData": msg}
+
+def write_trace(path, n, **kwargs):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, entry in enumerate(iter_trace(n, **kwargs)):
+            f.write((",\n" if i else "") + json.dumps(entry, ensure_ascii=False))
+        f.write("\n]")
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetischen Rohtrace erzeugen")
+    parser.add_argument("output")
+    parser.add_argument("-n", "--entries", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speed", type=float, default=14.0, help="Fahrgeschwindigkeit in m/s")
+    args = parser.parse_args()
+    write_trace(args.output, args.entries, seed=args.seed, speed_mps=args.speed)
+
+if __name__ == "__main__":
+    main()
@@ -1,115 +1,859 @@
+import argparse
+import bz2
+import codecs
+import gzip
+import hashlib
+import io
 import json
+import logging
+import lzma
+import math
+import os
 import re
+import struct
+import sys
+import time
+import zipfile
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta, timezone
 
-def extract_dab(data):
-    dab_entries = []
+CHUNK_SIZE = 1 << 16
+MIN_PART_SIZE = 4 << 20
+MAX_PART_SIZE = 16 << 20
+MAX_ENTRY_SIZE = 1 << 20
+HEAD_SIZE = 4096
+
+_WHITESPACE = re.compile(r"\s*")
+_SEPARATOR = re.compile(r"[\s,]*")
+_BOUNDARY = re.compile(rb"\}\s*,\s*(\{)")
+_decoder = json.JSONDecoder()
+_encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+JSON_BATCH_SIZE = 1000
+
+# Gleicher Logger und gleiches Format wie die Stufenmessung der Analyse-App (analysis/perf.py)
+perf_logger = logging.getLogger("radioanalyse.perf")
+logger = logging.getLogger("radioanalyse.extract")
+
+# Spaltenformat (.rtc): Magic, danach beliebig viele Segmente aus
+# uint32-Headerlänge, JSON-Header {type, count, columns} und den Spalten als
+# Little-Endian-Arrays, jeweils auf 8 Byte ausgerichtet.
+COLUMNAR_MAGIC = b"RTCOL01\n"
+SEGMENT_SIZE = 1 << 16
+NO_TIMESTAMP = -(1 << 63)
+
+COLUMNS = {
+    "dab": [("timeStamp", "q"), ("F_kHz", "i"), ("TL", "h"), ("SNR", "h")],
+    "fm": [("timeStamp", "q"), ("FQ_kHz", "i"), ("FS", "h"), ("SNR", "h")],
+    "gnss": [("timeStamp", "q"), ("ts", "d"), ("lat", "d"), ("lon", "d"), ("hdg", "f"), ("fix", "h"), ("antenna", "h")],
+}
+_DTYPES = {"q": "<i8", "i": "<i4", "h": "<i2", "d": "<f8", "f": "<f4"}
+_EPOCH = datetime(1970, 1, 1)
+_MILLISECOND = timedelta(milliseconds=1)
+_ISO_COMPAT = re.compile(r"(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2})?)(?:[.,](\d+))?\s*(Z|[+-]\d{2}(?::?\d{2})?)?$")
+
+def iso_compat(value):
+    # Formen, die fromisoformat erst ab Python 3.11 liest: "Z", "+0200", Sekundenbruchteile mit
+    # beliebig vielen Stellen. Umgeschrieben in die Form, die auch ältere Versionen kennen.
+    match = _ISO_COMPAT.match(value.strip())
+    if not match:
+        return None
+    base, fraction, zone = match.groups()
+    if fraction:
+        base += "." + (fraction + "000000")[:6]
+    if zone == "Z":
+        zone = "+00:00"
+    elif zone:
+        zone = zone[:3] + ":" + (zone[-2:] if len(zone) > 3 else "00")
+    return base + (zone or "")
+
+def timestamp_ms(value):
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        compat = iso_compat(value) if isinstance(value, str) else None
+        if compat is None:
+            return NO_TIMESTAMP
+        try:
+            dt = datetime.fromisoformat(compat)
+        except ValueError:
+            return NO_TIMESTAMP
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _MILLISECOND
+
+def parse_timestamp(value):
+    # Einmal im Extraktor nach Epoch-Millisekunden, None wenn nicht lesbar. Kostet einmal pro Trace,
+    # die Analyse spart dafür bei jedem Laden das String-Parsing (benchmarks/bench_timestamps.py)
+    ms = timestamp_ms(value)
+    return None if ms == NO_TIMESTAMP else ms
+
+def build_dab(entry, match):
+    f, tl, snr = match.groups()
+    return {
+        "type": "dab",
+        "timeStamp": parse_timestamp(entry.get("timeStamp")),
+        "F_kHz": int(f),
+        "TL": int(tl),
+        "SNR": int(snr)
+    }
+
+def build_fm(entry, match):
+    fq, fs, snr = match.groups()
+    return {
+        "type": "fm",
+        "timeStamp": parse_timestamp(entry.get("timeStamp")),
+        "FQ_kHz": int(fq),
+        "FS": int(fs),
+        "SNR": int(snr)
+    }
+
+def build_gnss(entry, match):
+    ts, lat, lon, hdg, fix, antenna = match.groups()
+    return {
+        "type": "gnss",
+        "timeStamp": parse_timestamp(entry.get("timeStamp")),
+        "ts": float(ts),
+        "lat": float(lat),
+        "lon": float(lon),
+        "hdg": hdg,
+        "fix": int(fix),
+        "antenna": int(antenna)
+    }
+
+def build_raw(typ):
+    def build(entry, match):
+        return {"type": typ, "timeStamp": parse_timestamp(entry.get("timeStamp")), "msgData": entry.get("msgData", "")}
+    return build
+
+# Regeltabelle: (Typ, Pflicht-Tags, Muster, Builder) - die Reihenfolge ist die Priorität
+RULES = []
+_dispatch = []
+
+def register_rule(typ, tags, pattern=None, build=None):
+    tags = tuple(tags)
+    rule = (typ, tags, re.compile(pattern) if pattern else None, build or build_raw(typ))
+    RULES.append(rule)
+    # Hot-Loop-Sicht: erster Tag als schneller Substring-Vorfilter, restliche Tags nur bei Treffer
+    _dispatch.append((tags[0], tags[1:], rule[2], rule[3]))
+    return rule
+
+register_rule("dab", ["MER_NXP_MOD# QUAL", "isAudio=1"], r"F=(\d+)\s+EQ=.*?TL=(-?\d+)\s+SNR=(\d+)", build_dab)
+register_rule("fm", ["T[1/0x231]"], r"fq (\d+), fs (\d+), .*?snr (\d+)", build_fm)
+register_rule("gnss", ["TRK-GNSS"], r"ts=([\d\.]+), pos=\(([-\d\.]+), ([-\d\.]+),.*?\), hdg=([\-\w\.]+), fix=(\d+), antenna=(\d+)", build_gnss)
+
+def classify(entry):
+    msg = entry.get("msgData", "")
+    for tag, extra, pattern, build in _dispatch:
+        if tag in msg:
+            for other in extra:
+                if other not in msg:
+                    break
+            else:
+                if pattern is None:
+                    return build(entry, None)
+                match = pattern.search(msg)
+                return build(entry, match) if match else None
+    return None
+
+def extract_type(data, typ):
+    entries = []
     for entry in data:
         msg = entry.get("msgData", "")
-        if "MER_NXP_MOD# QUAL" in msg and "isAudio=1" in msg:
-            match = re.search(r"F=(\d+)\s+EQ=.*?TL=(-?\d+)\s+SNR=(\d+)", msg)
-            if match:
-                f, tl, snr = match.groups()
-                dab_entries.append({
-                    "type": "dab",
-                    "timeStamp": entry.get("timeStamp", ""),
-                    "F_kHz": int(f),
-                    "TL": int(tl),
-                    "SNR": int(snr)
-                })
-    return dab_entries
+        for rule_typ, tags, pattern, build in RULES:
+            if rule_typ == typ and all(tag in msg for tag in tags):
+                match = pattern.search(msg) if pattern else None
+                if match or pattern is None:
+                    entries.append(build(entry, match))
+                break
+    return entries
+
+def extract_dab(data):
+    return extract_type(data, "dab")
 
 def extract_fm(data):
-    fm_entries = []
-    for entry in data:
-        msg = entry.get("msgData", "")
-        if "T[1/0x231]" in msg:
-            match = re.search(r"fq (\d+), fs (\d+), .*?snr (\d+)", msg)
-            if match:
-                fq, fs, snr = match.groups()
-                fm_entries.append({
-                    "type": "fm",
-                    "timeStamp": entry.get("timeStamp", ""),
-                    "FQ_kHz": int(fq),
-                    "FS": int(fs),
-                    "SNR": int(snr)
-                })
-    return fm_entries
+    return extract_type(data, "fm")
 
 def extract_gnss(data):
-    gnss_entries = []
-    for entry in data:
-        msg = entry.get("msgData", "")
-        if "TRK-GNSS" in msg:
-            match = re.search(r"ts=([\d\.]+), pos=\(([-\d\.]+), ([-\d\.]+),.*?\), hdg=([\-\w\.]+), fix=(\d+), antenna=(\d+)", msg)
-            if match:
-                ts, lat, lon, hdg, fix, antenna = match.groups()
-                gnss_entries.append({
-                    "type": "gnss",
-                    "timeStamp": entry.get("timeStamp", ""),
-                    "ts": float(ts),
-                    "lat": float(lat),
-                    "lon": float(lon),
-                    "hdg": hdg,
-                    "fix": int(fix),
-                    "antenna": int(antenna)
-                })
-    return gnss_entries
-
-def process_file(input_path, output_path, progress_callback=None):
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    total = len(data)
-    combined = []
-
-    for i, entry in enumerate(data):
-        msg = entry.get("msgData", "")
+    return extract_type(data, "gnss")
+
+def iter_entries(f, start=0, end=None, state=None):
+    # Mit state wird ein noch unvollständiger letzter Eintrag (wachsende Datei) nicht
+    # als Fehler gewertet; state erhält den Byte-Offset, ab dem weitergelesen werden kann
+    reader = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    eof = False
+    started = start > 0
+
+    if start:
+        f.seek(start)
+
+    while True:
+        pos = (_SEPARATOR if started else _WHITESPACE).match(buf, pos).end()
+
+        if pos < len(buf):
+            if not started:
+                if buf[pos] != "[":
+                    raise ValueError("Trace muss ein JSON-Array sein")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                if state is not None:
+                    state["closed"] = True
+                    state["offset"] = resume_offset(f, reader, buf, pos)
+                return
+            try:
+                entry, entry_end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    if state is None:
+                        raise
+                    state["offset"] = resume_offset(f, reader, buf, pos)
+                    return
+            else:
+                pos = entry_end
+                yield entry
+                continue
+        elif eof:
+            if state is not None:
+                state["offset"] = resume_offset(f, reader, buf, pos) if started else 0
+            return
+
+        size = CHUNK_SIZE if end is None else min(CHUNK_SIZE, end - f.tell())
+        chunk = f.read(size) if size > 0 else b""
+        eof = not chunk
+        buf = buf[pos:] + reader.decode(chunk, final=eof)
+        pos = 0
+
+# Erkennung am Dateianfang, damit auch umbenannte Dateien und Uploads funktionieren
+COMPRESSION_MAGIC = [
+    (b"\x1f\x8b", "gz"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"PK\x03\x04", "zip"),
+]
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zip")
+
+def input_compression(source):
+    # source: Pfad, Bytes oder seekbare Binärdatei; liefert "gz", "bz2", "xz", "zip" oder None
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            head = f.read(8)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        head = bytes(source[:8])
+    else:
+        pos = source.tell()
+        head = source.read(8)
+        source.seek(pos)
+    for magic, kind in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return kind
+    return None
+
+def zip_member(archive):
+    # Erste JSON-Datei im Archiv, ersatzweise die einzige Datei
+    names = [info.filename for info in archive.infolist() if not info.is_dir()]
+    json_names = [name for name in names if name.lower().endswith(".json")]
+    if json_names:
+        return json_names[0]
+    if len(names) == 1:
+        return names[0]
+    raise ValueError("ZIP-Archiv enthält keine JSON-Datei")
+
+@contextmanager
+def open_input(source):
+    # Liefert (Datenstrom, Rohdatei): komprimierte Quellen werden beim Lesen blockweise entpackt,
+    # nie vollständig auf Platte oder im Speicher. Fortschritt über die Position in der Rohdatei.
+    with ExitStack() as stack:
+        raw = stack.enter_context(open(source, "rb")) if isinstance(source, (str, os.PathLike)) else source
+        kind = input_compression(raw)
+        if kind == "gz":
+            stream = stack.enter_context(gzip.GzipFile(fileobj=raw, mode="rb"))
+        elif kind == "bz2":
+            stream = stack.enter_context(bz2.BZ2File(raw))
+        elif kind == "xz":
+            stream = stack.enter_context(lzma.LZMAFile(raw))
+        elif kind == "zip":
+            archive = stack.enter_context(zipfile.ZipFile(raw))
+            stream = stack.enter_context(archive.open(zip_member(archive)))
+        else:
+            stream = raw
+        yield stream, raw
+
+def resume_offset(f, reader, buf, pos):
+    # Byte-Position von buf[pos] in der Datei: gelesene Bytes minus noch nicht dekodierte und ungenutzte
+    return f.tell() - len(reader.getstate()[0]) - len(buf[pos:].encode("utf-8"))
+
+def iter_records(entries):
+    for entry in entries:
+        record = classify(entry)
+        if record is not None:
+            yield record
+
+def encode_batches(records, batch_size=JSON_BATCH_SIZE):
+    # Je Batch der Text von json.dumps(batch, indent=2) ohne die äußeren Klammern;
+    # ein gemeinsamer Encoder statt json.dumps pro Datensatz
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield _encoder.encode(batch)[1:-2]
+            batch = []
+    if batch:
+        yield _encoder.encode(batch)[1:-2]
+
+def write_chunks(chunks, out, first=True):
+    for chunk in chunks:
+        out.write(("[" if first else ",") + chunk)
+        first = False
+    out.write("[]" if first else "\n]")
+
+def write_json(records, out, first=True):
+    # Gleiche Formatierung wie json.dump(..., indent=2), aber batchweise statt als ganze Liste
+    write_chunks(encode_batches(records), out, first)
+
+def track_progress(entries, f, total, progress_callback):
+    for i, entry in enumerate(entries):
+        if i % 100 == 0:
+            percent = int((f.tell() / total) * 100) if total else 0
+            progress_callback(min(percent, 99))
+        yield entry
+
+def column_value(record, name):
+    value = record.get(name)
+    if name == "timeStamp":
+        # Datensätze tragen bereits Epoch-Millisekunden (None = nicht lesbar)
+        if value is None:
+            return NO_TIMESTAMP
+        return value if type(value) is int else timestamp_ms(value)
+    if name == "hdg":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+    return value
+
+class ColumnarWriter:
+    def __init__(self, out, segment_size=SEGMENT_SIZE, append=False):
+        self.out = out
+        self.segment_size = segment_size
+        self.columns = {typ: [array(code) for _, code in cols] for typ, cols in COLUMNS.items()}
+        self.counts = dict.fromkeys(COLUMNS, 0)
+        if not append:
+            out.write(COLUMNAR_MAGIC)
+
+    def add(self, record):
+        typ = record.get("type")
+        if typ not in COLUMNS:
+            return
+        for (name, _), column in zip(COLUMNS[typ], self.columns[typ]):
+            column.append(column_value(record, name))
+        self.counts[typ] += 1
+        if self.counts[typ] >= self.segment_size:
+            self.flush(typ)
+
+    def feed(self, records):
+        for record in records:
+            self.add(record)
+            yield record
+
+    def flush(self, typ):
+        if not self.counts[typ]:
+            return
+        header = json.dumps({
+            "type": typ,
+            "count": self.counts[typ],
+            "columns": [[name, _DTYPES[code]] for name, code in COLUMNS[typ]]
+        }).encode("utf-8")
+        self.out.write(struct.pack("<I", len(header)) + header)
+        self._pad()
+        for column in self.columns[typ]:
+            if sys.byteorder == "big":
+                column.byteswap()
+            column.tofile(self.out)
+            self._pad()
+        self.columns[typ] = [array(code) for _, code in COLUMNS[typ]]
+        self.counts[typ] = 0
+
+    def close(self):
+        for typ in COLUMNS:
+            self.flush(typ)
+
+    def _pad(self):
+        self.out.write(b"\0" * (-self.out.tell() % 8))
 
-        if "MER_NXP_MOD# QUAL" in msg and "isAudio=1" in msg:
-            match = re.search(r"F=(\d+)\s+EQ=.*?TL=(-?\d+)\s+SNR=(\d+)", msg)
-            if match:
-                f, tl, snr = match.groups()
-                combined.append({
-                    "type": "dab",
-                    "timeStamp": entry.get("timeStamp", ""),
-                    "F_kHz": int(f),
-                    "TL": int(tl),
-                    "SNR": int(snr)
-                })
-
-        elif "T[1/0x231]" in msg:
-            match = re.search(r"fq (\d+), fs (\d+), .*?snr (\d+)", msg)
-            if match:
-                fq, fs, snr = match.groups()
-                combined.append({
-                    "type": "fm",
-                    "timeStamp": entry.get("timeStamp", ""),
-                    "FQ_kHz": int(fq),
-                    "FS": int(fs),
-                    "SNR": int(snr)
-                })
-
-        elif "TRK-GNSS" in msg:
-            match = re.search(r"ts=([\d\.]+), pos=\(([-\d\.]+), ([-\d\.]+),.*?\), hdg=([\-\w\.]+), fix=(\d+), antenna=(\d+)", msg)
-            if match:
-                ts, lat, lon, hdg, fix, antenna = match.groups()
-                combined.append({
-                    "type": "gnss",
-                    "timeStamp": entry.get("timeStamp", ""),
-                    "ts": float(ts),
-                    "lat": float(lat),
-                    "lon": float(lon),
-                    "hdg": hdg,
-                    "fix": int(fix),
-                    "antenna": int(antenna)
-                })
-
-        if progress_callback and i % 100 == 0:
-            percent = int((i / total) * 100)
-            progress_callback(percent)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(combined, f, indent=2, ensure_ascii=False)
+def is_entry_start(f, offset):
+    # Ein nicht-leeres Objekt kann nicht innerhalb eines JSON-Strings beginnen (Anführungszeichen
+    # wären dort escaped) - verschachtelte Objekte werden über die Trace-Felder ausgeschlossen.
+    try:
+        entry = next(iter_entries(f, offset, offset + MAX_ENTRY_SIZE), None)
+    except (json.JSONDecodeError, ValueError):
+        return False
+    return isinstance(entry, dict) and ("msgData" in entry or "timeStamp" in entry)
 
+def find_boundaries(input_path, parts):
+    size = os.path.getsize(input_path)
+    boundaries = [0]
+
+    with open(input_path, "rb") as f:
+        for k in range(1, parts):
+            offset = max(size * k // parts, boundaries[-1] + 1)
+            while offset < size:
+                f.seek(offset)
+                window = f.read(CHUNK_SIZE)
+                candidates = [offset + m.start(1) for m in _BOUNDARY.finditer(window)]
+                found = next((c for c in candidates if is_entry_start(f, c)), None)
+                if found is not None:
+                    boundaries.append(found)
+                    break
+                # Überlappung, damit eine Grenze am Fensterende nicht verloren geht
+                offset += max(len(window) - 64, 1)
+
+    boundaries.append(size)
+    return sorted(set(boundaries))
+
+def count_entries(entries, stats):
+    for entry in entries:
+        stats["entries"] += 1
+        yield entry
+
+def count_records(records, stats):
+    counts = stats["records"]
+    for record in records:
+        counts[record["type"]] = counts.get(record["type"], 0) + 1
+        # Fehlender oder nicht lesbarer Zeitstempel: der Datensatz bleibt, aber ohne Zeit
+        if record.get("timeStamp") is None:
+            stats["bad_timestamps"] += 1
+        yield record
+
+def extract_range(args):
+    # Läuft im Worker: liefert den Teil bereits fertig kodiert (JSON-Text ohne Klammern, .rtc-Segmente),
+    # der Elternprozess schreibt nur noch
+    input_path, start, end, columnar = args
+    stats = {"entries": 0, "records": {}, "bad_timestamps": 0}
+    rtc = io.BytesIO() if columnar else None
+    with open(input_path, "rb") as f:
+        records = count_records(iter_records(count_entries(iter_entries(f, start, end), stats)), stats)
+        if columnar:
+            writer = ColumnarWriter(rtc, append=True)
+            records = writer.feed(records)
+        text = ",".join(encode_batches(records))
+        if columnar:
+            writer.close()
+    return stats, text, rtc.getvalue() if columnar else None
+
+def iter_parts_parallel(input_path, workers, columnar=False):
+    size = os.path.getsize(input_path)
+    parts = min(workers * 4, max(size // MIN_PART_SIZE, 1))
+    # Große Traces in mehr Teile schneiden, damit ein Teilergebnis klein bleibt
+    parts = max(parts, math.ceil(size / MAX_PART_SIZE))
+    boundaries = find_boundaries(input_path, parts)
+    ranges = [(input_path, start, end, columnar) for start, end in zip(boundaries, boundaries[1:])]
+
+    # Höchstens workers + 1 Teile gleichzeitig unterwegs; Ergebnisse in Dateireihenfolge
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for job in ranges:
+            pending.append((job[2], pool.submit(extract_range, job)))
+            if len(pending) > workers:
+                end, future = pending.popleft()
+                yield end, future.result()
+        while pending:
+            end, future = pending.popleft()
+            yield end, future.result()
+
+@contextmanager
+def replaced_outputs(*paths):
+    # Erst nach <ziel>.tmp schreiben und nur bei Erfolg ersetzen: ein Abbruch mitten im Trace
+    # (kaputter Eintrag, abgeschnittenes Archiv) lässt die vorige Ausgabe unberührt
+    tmp_paths = [path + ".tmp" if path else None for path in paths]
+    try:
+        yield tmp_paths
+    except BaseException:
+        for tmp_path in tmp_paths:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    for path, tmp_path in zip(paths, tmp_paths):
+        if path:
+            os.replace(tmp_path, path)
+
+def write_parallel(input_path, workers, output_path, columnar_path=None, progress_callback=None, stats=None):
+    size = os.path.getsize(input_path)
+    with replaced_outputs(output_path, columnar_path) as (json_tmp, rtc_tmp), ExitStack() as stack:
+        out = stack.enter_context(open(json_tmp, "w", encoding="utf-8"))
+        cout = stack.enter_context(open(rtc_tmp, "wb")) if rtc_tmp else None
+        if cout:
+            cout.write(COLUMNAR_MAGIC)
+
+        def chunks():
+            for end, (part_stats, text, rtc) in iter_parts_parallel(input_path, workers, cout is not None):
+                if stats is not None:
+                    stats["entries"] += part_stats["entries"]
+                    stats["bad_timestamps"] += part_stats["bad_timestamps"]
+                    for typ, n in part_stats["records"].items():
+                        stats["records"][typ] = stats["records"].get(typ, 0) + n
+                if cout:
+                    # Segmente sind auf 8 Byte aufgefüllt, die Ausrichtung bleibt beim Aneinanderhängen erhalten
+                    cout.write(rtc)
+                if progress_callback:
+                    progress_callback(min(int((end / size) * 100), 99) if size else 0)
+                if text:
+                    yield text
+
+        write_chunks(chunks(), out)
+
+def write_outputs(records, output_path, columnar_path=None):
+    with replaced_outputs(output_path, columnar_path) as (json_tmp, rtc_tmp), open(json_tmp, "w", encoding="utf-8") as out:
+        if not rtc_tmp:
+            write_json(records, out)
+            return
+        with open(rtc_tmp, "wb") as cout:
+            writer = ColumnarWriter(cout)
+            write_json(writer.feed(records), out)
+            writer.close()
+
+def append_json(records, output_path):
+    # Schließende Klammer einer vorhandenen Ausgabe überschreiben und dahinter weiterschreiben
+    with open(output_path, "r+b") as raw:
+        size = raw.seek(0, os.SEEK_END)
+        raw.seek(max(size - 16, 0))
+        tail = raw.read()
+        close = tail.rfind(b"]")
+        head = tail[:close].rstrip()
+        if close < 0 or not head:
+            raise ValueError(f"Ausgabedatei '{output_path}' ist unvollständig")
+        empty = head.endswith(b"[")
+        raw.seek(size - len(tail) + len(head) - (1 if empty else 0))
+        out = io.TextIOWrapper(raw, encoding="utf-8")
+        write_json(records, out, first=empty)
+        out.flush()
+        raw.truncate()
+        out.detach()
+
+def append_outputs(records, output_path, columnar_path=None):
+    if not columnar_path:
+        append_json(records, output_path)
+        return
+    with open(columnar_path, "ab") as cout:
+        writer = ColumnarWriter(cout, append=True)
+        append_json(writer.feed(records), output_path)
+        writer.close()
+
+def state_path(output_path):
+    return output_path + ".state"
+
+def file_head(path, size):
+    # Fingerabdruck des bereits gelesenen Dateianfangs: erkennt eine ersetzte Quelldatei mit gleichem Namen
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(size)).hexdigest()
+
+def load_state(input_path, output_path, columnar_path=None):
+    try:
+        with open(state_path(output_path), encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    outputs = {"json": output_path, "rtc": columnar_path}
+    for key, path in outputs.items():
+        if bool(path) != (key in state["sizes"]):
+            return None
+        # Nach einem Abbruch mitten im Anhängen auf den letzten konsistenten Stand zurücksetzen
+        if path and (not os.path.exists(path) or os.path.getsize(path) < state["sizes"][key]):
+            return None
+    # Der Offset zählt entpackte Bytes - bei komprimierten Quellen ist die Dateigröße kein Maßstab
+    if input_compression(input_path) is None and os.path.getsize(input_path) < state["offset"]:
+        return None
+    if file_head(input_path, state["head_size"]) != state["head"]:
+        return None
+
+    for key, path in outputs.items():
+        if path and os.path.getsize(path) > state["sizes"][key]:
+            with open(path, "r+b") as f:
+                f.truncate(state["sizes"][key])
+    return state
+
+def save_state(state, input_path, output_path, columnar_path=None):
+    state["head_size"] = min(state["offset"], HEAD_SIZE)
+    state["head"] = file_head(input_path, state["head_size"])
+    state["sizes"] = {"json": os.path.getsize(output_path)}
+    if columnar_path:
+        state["sizes"]["rtc"] = os.path.getsize(columnar_path)
+    tmp_path = state_path(output_path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path(output_path))
+
+def last_entry(entries, state):
+    for entry in entries:
+        state["entries"] += 1
+        state["last_timeStamp"] = entry.get("timeStamp", state["last_timeStamp"])
+        yield entry
+
+# Tag-Index (<trace>.tags): die Datei in Blöcke an Eintragsgrenzen teilen und je Tag merken,
+# in welchen Blöcken er vorkommt. Gesucht wird im Rohtext ohne JSON-Parsing; ein Treffer
+# außerhalb von msgData kostet nur einen unnötig gelesenen Block. Nur für unkomprimierte
+# Traces - in komprimierten Strömen lässt sich nicht springen.
+INDEX_VERSION = 1
+INDEX_BLOCK_SIZE = 1 << 20
+INDEX_MAX_SHARE = 0.5
+SNIPPET_TAGS = ["LRID0x161", "LRID0x162", "T[3/0x232]", "T[4/0x233]"]
+
+def index_path(input_path):
+    return input_path + ".tags"
+
+def rule_tags():
+    # Erster Pflicht-Tag jeder Regel: ein Block ohne diese Tags liefert keinen Datensatz
+    return list(dict.fromkeys(tags[0] for _, tags, _, _ in RULES))
+
+def tag_needles(tag):
+    # Tag so, wie er im JSON-Text stehen kann: escaped, wahlweise mit "\/" oder \uXXXX für Nicht-ASCII
+    text = json.dumps(tag, ensure_ascii=False)[1:-1]
+    variants = {text, text.replace("/", "\\/"), json.dumps(tag)[1:-1]}
+    return [variant.encode("utf-8") for variant in variants]
+
+def build_index(input_path, tags=None, block_size=INDEX_BLOCK_SIZE):
+    tags = list(dict.fromkeys(tags or rule_tags() + SNIPPET_TAGS))
+    if input_compression(input_path):
+        raise ValueError("Tag-Index nur für unkomprimierte Traces")
+    st = os.stat(input_path)
+    blocks = find_boundaries(input_path, max(math.ceil(st.st_size / block_size), 1))
+    needles = {tag: tag_needles(tag) for tag in tags}
+    found = {tag: [] for tag in tags}
+    with open(input_path, "rb") as f:
+        for i, (start, end) in enumerate(zip(blocks, blocks[1:])):
+            f.seek(start)
+            block = f.read(end - start)
+            for tag, variants in needles.items():
+                if any(needle in block for needle in variants):
+                    found[tag].append(i)
+    return {
+        "version": INDEX_VERSION,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "head": file_head(input_path, HEAD_SIZE),
+        "blocks": blocks,
+        "tags": found,
+    }
+
+def save_index(index, input_path):
+    tmp_path = index_path(input_path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path(input_path))
+
+def load_index(input_path, tags=()):
+    # None, wenn kein Index da ist, die Quelle sich geändert hat oder ein Tag fehlt
+    try:
+        with open(index_path(input_path), encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    st = os.stat(input_path)
+    if index.get("version") != INDEX_VERSION or (index["size"], index["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+        return None
+    if any(tag not in index["tags"] for tag in tags) or file_head(input_path, HEAD_SIZE) != index["head"]:
+        return None
+    return index
+
+def indexed_tags(input_path):
+    try:
+        with open(index_path(input_path), encoding="utf-8") as f:
+            return list(json.load(f)["tags"])
+    except (OSError, ValueError, KeyError):
+        return []
+
+def ensure_index(input_path, tags=()):
+    # Fehlt ein Tag oder ist der Index veraltet, neu aufbauen - mit allen bisher indizierten Tags
+    index = load_index(input_path, tags)
+    if index is None:
+        index = build_index(input_path, rule_tags() + SNIPPET_TAGS + indexed_tags(input_path) + list(tags))
+        save_index(index, input_path)
+    return index
+
+def tag_ranges(index, tags):
+    # Byte-Bereiche aller Blöcke mit mindestens einem der Tags, benachbarte Blöcke zusammengefasst
+    blocks = index["blocks"]
+    ranges = []
+    for i in sorted({i for tag in tags for i in index["tags"][tag]}):
+        start, end = blocks[i], blocks[i + 1]
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return ranges
+
+def iter_ranges(f, ranges):
+    for start, end in ranges:
+        yield from iter_entries(f, start, end)
+
+def indexed_ranges(input_path, tags):
+    # Nur nutzen, wenn ein passender Index existiert und er deutlich weniger zu lesen verspricht
+    index = load_index(input_path, tags)
+    if index is None:
+        return None
+    ranges = tag_ranges(index, tags)
+    if sum(end - start for start, end in ranges) > INDEX_MAX_SHARE * index["size"]:
+        return None
+    return ranges
+
+def filter_tags(input_path, tags):
+    # Rohtrace-Einträge, deren msgData einen der Tags enthält; mit Index nur die passenden Blöcke
+    ranges = None
+    if not input_compression(input_path):
+        ranges = tag_ranges(ensure_index(input_path, tags), tags)
+    with open_input(input_path) as (f, _):
+        entries = iter_entries(f) if ranges is None else iter_ranges(f, ranges)
+        for entry in entries:
+            msg = entry.get("msgData")
+            if msg is not None and any(tag in msg for tag in tags):
+                yield entry
+
+def finish_stats(stats, started):
+    seconds = time.perf_counter() - started
+    stats["seconds"] = round(seconds, 4)
+    stats["rows"] = stats["entries"]
+    stats["entries_per_sec"] = round(stats["entries"] / seconds) if seconds else None
+    stats["records_per_sec"] = {typ: round(n / seconds) if seconds else None for typ, n in stats["records"].items()}
+    return stats
+
+def process_file(input_path, output_path, progress_callback=None, workers=1, columnar_path=None, stats_callback=None,
+                 incremental=False):
+    total = os.path.getsize(input_path)
+    stats = {"stage": "extract", "input": os.path.basename(input_path), "bytes": total, "entries": 0, "records": {},
+             "bad_timestamps": 0}
+    started = time.perf_counter()
+    compression = input_compression(input_path)
+    if compression:
+        stats["compression"] = compression
+
+    # Vorhandener Tag-Index: nur Blöcke lesen, in denen eine Regel zutreffen kann
+    ranges = None if incremental or compression else indexed_ranges(input_path, rule_tags())
+
+    if incremental:
+        # Nur der Teil hinter dem gespeicherten Offset wird gelesen und an die Ausgaben angehängt
+        state = load_state(input_path, output_path, columnar_path)
+        resumed = state is not None
+        if not resumed:
+            state = {"input": os.path.abspath(input_path), "offset": 0, "entries": 0, "last_timeStamp": None}
+        stats["resumed_from"] = state["offset"]
+        if not compression:
+            stats["bytes"] = total - state["offset"]
+        with open_input(input_path) as (f, raw):
+            entries = count_entries(last_entry(iter_entries(f, state["offset"], state=state), state), stats)
+            if progress_callback:
+                entries = track_progress(entries, raw, total, progress_callback)
+            records = count_records(iter_records(entries), stats)
+            if resumed:
+                append_outputs(records, output_path, columnar_path)
+            else:
+                write_outputs(records, output_path, columnar_path)
+        save_state(state, input_path, output_path, columnar_path)
+        stats["closed"] = state.get("closed", False)
+    elif ranges is not None:
+        stats["indexed_bytes"] = sum(end - start for start, end in ranges)
+        with open(input_path, "rb") as f:
+            entries = count_entries(iter_ranges(f, ranges), stats)
+            if progress_callback:
+                entries = track_progress(entries, f, total, progress_callback)
+            write_outputs(count_records(iter_records(entries), stats), output_path, columnar_path)
+    elif workers > 1 and total >= 2 * MIN_PART_SIZE and not compression:
+        # Komprimierte Ströme lassen sich nicht an Byte-Grenzen aufteilen und laufen seriell
+        stats["workers"] = workers
+        write_parallel(input_path, workers, output_path, columnar_path, progress_callback, stats)
+    else:
+        with open_input(input_path) as (f, raw):
+            entries = count_entries(iter_entries(f), stats)
+            if progress_callback:
+                entries = track_progress(entries, raw, total, progress_callback)
+            write_outputs(count_records(iter_records(entries), stats), output_path, columnar_path)
+
+    finish_stats(stats, started)
+    perf_logger.info(json.dumps(stats))
+    if stats["bad_timestamps"]:
+        logger.warning("%s: %d Datensätze ohne lesbaren Zeitstempel", stats["input"], stats["bad_timestamps"])
+    if stats_callback:
+        stats_callback(stats)
     if progress_callback:
         progress_callback(100)
+    return stats
+
+def follow(input_path, output_path, interval=2.0, columnar_path=None, stats_callback=None, stop=None):
+    # Wie "tail -f": Neue Einträge laufend anhängen, bis der Trace mit "]" abgeschlossen ist
+    last_size = None
+    while not (stop and stop()):
+        size = os.path.getsize(input_path)
+        if size != last_size:
+            stats = process_file(input_path, output_path, columnar_path=columnar_path, incremental=True)
+            last_size = size
+            if stats_callback and (stats["entries"] or stats["closed"]):
+                stats_callback(stats)
+            if stats["closed"]:
+                return
+        time.sleep(interval)
+
+def format_stats(stats):
+    rates = ", ".join(f"{typ}: {n} ({stats['records_per_sec'][typ]}/s)" for typ, n in sorted(stats["records"].items()))
+    text = f"{stats['entries']} Einträge in {stats['seconds']:.1f} s ({stats['entries_per_sec']}/s) - {rates or 'keine Datensätze'}"
+    if stats.get("bad_timestamps"):
+        text += f" - {stats['bad_timestamps']} ohne lesbaren Zeitstempel"
+    return text
+
+def default_output_path(input_path):
+    base = input_path
+    if base.lower().endswith(COMPRESSED_SUFFIXES):
+        base = os.path.splitext(base)[0]
+    base = os.path.splitext(base)[0]
+    return base + "_extracted.json"
+
+def columnar_output_path(output_path):
+    return os.path.splitext(output_path)[0] + ".rtc"
+
+def main():
+    parser = argparse.ArgumentParser(description="Radio Trace Extractor")
+    parser.add_argument("input", help="Rohdaten-Trace (JSON, auch .json.gz/.bz2/.xz oder ZIP)")
+    parser.add_argument("-o", "--output", help="Zieldatei (Standard: <input>_extracted.json)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Anzahl paralleler Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Zusätzlich das kompakte Spaltenformat (.rtc) neben der JSON-Datei schreiben")
+    parser.add_argument("-i", "--incremental", action="store_true",
+                        help="Nur neue Einträge seit dem letzten Lauf verarbeiten und an die Ausgabe anhängen")
+    parser.add_argument("-f", "--follow", action="store_true",
+                        help="Wachsenden Trace beobachten und neue Einträge laufend anhängen (Strg+C beendet)")
+    parser.add_argument("--interval", type=float, default=2.0, help="Prüfintervall für --follow in Sekunden (Standard: 2)")
+    parser.add_argument("--index", action="store_true",
+                        help="Tag-Index (<quelle>.tags) anlegen bzw. aktualisieren; spätere Läufe lesen nur passende Blöcke")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Messwerte als strukturierte Logzeilen ausgeben")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(name)s %(message)s")
+
+    if args.index:
+        if input_compression(args.input):
+            parser.error("--index gilt nur für unkomprimierte Traces")
+        ensure_index(args.input)
+        print(f"Gespeichert: {index_path(args.input)}")
+    output_path = args.output or default_output_path(args.input)
+    columnar_path = columnar_output_path(output_path) if args.columnar else None
+    if args.follow:
+        print(f"Beobachte {args.input} ... (Strg+C beendet)")
+        try:
+            follow(args.input, output_path, args.interval, columnar_path, stats_callback=lambda s: print(format_stats(s)))
+        except KeyboardInterrupt:
+            pass
+        print(f"Gespeichert: {output_path}")
+        return
+    stats = process_file(args.input, output_path, workers=max(args.workers, 1), columnar_path=columnar_path,
+                         incremental=args.incremental)
+    print(format_stats(stats))
+    print(f"Gespeichert: {output_path}")
+    if columnar_path:
+        print(f"Gespeichert: {columnar_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import lzma
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from extract import (
+    CHUNK_SIZE, COMPRESSED_SUFFIXES, columnar_output_path, default_output_path, perf_logger, process_file
+)
+
+# Viele Rohtraces auf einmal, z. B. nächtlich auf einem Server ohne Oberfläche:
+#   python extract_batch.py <ordner|datei|muster> ... [-o <zielordner>] [-j <prozesse>] [--columnar]
+# Jede Datei läuft seriell in einem eigenen Prozess. Das Manifest merkt sich pro Quelle
+# Größe, Änderungszeit und SHA-256; unveränderte Traces werden beim nächsten Lauf übersprungen.
+
+MANIFEST_NAME = "extract_manifest.json"
+# Manifest nicht nach jeder Datei neu schreiben, sondern höchstens so oft - und am Ende des Laufs
+MANIFEST_SAVE_S = 30
+TRACE_SUFFIXES = (".json",) + tuple(".json" + suffix for suffix in COMPRESSED_SUFFIXES) + (".zip",)
+
+def is_trace(path):
+    name = os.path.basename(path).lower()
+    return name.endswith(TRACE_SUFFIXES) and not name.endswith("_extracted.json") and name != MANIFEST_NAME
+
+def expand_inputs(patterns):
+    # Ordner (nicht rekursiv), einzelne Dateien und Glob-Muster (** für Unterordner)
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(p for p in glob.glob(os.path.join(pattern, "*")) if os.path.isfile(p) and is_trace(p))
+        elif os.path.isfile(pattern):
+            paths.append(pattern)
+        else:
+            paths.extend(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p) and is_trace(p))
+    return sorted({os.path.abspath(p) for p in paths})
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE * 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def common_root(paths):
+    return os.path.commonpath([os.path.dirname(path) for path in paths])
+
+def output_paths(input_path, output_dir, columnar, root=None):
+    # Mit -o werden die Unterordner unterhalb des gemeinsamen Ordners der Quellen nachgebildet,
+    # damit gleichnamige Traces verschiedener Fahrzeuge sich nicht überschreiben
+    output_path = default_output_path(input_path)
+    if output_dir:
+        relative = os.path.relpath(output_path, root or os.path.dirname(input_path))
+        output_path = os.path.join(output_dir, relative)
+    return output_path, columnar_output_path(output_path) if columnar else None
+
+def duplicate_outputs(planned):
+    # Zwei Quellen mit derselben Ausgabe (z. B. trace.json und trace.json.gz im selben Ordner)
+    seen, duplicates = {}, []
+    for path, output_path, _ in planned:
+        if output_path in seen:
+            duplicates.append(f"{seen[output_path]} und {path} -> {output_path}")
+        seen.setdefault(output_path, path)
+    return duplicates
+
+def default_manifest_path(paths, output_dir=None):
+    # Im Zielordner, sonst im gemeinsamen Ordner aller Quellen - unabhängig vom Arbeitsverzeichnis
+    return os.path.join(output_dir or common_root(paths), MANIFEST_NAME)
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, path):
+    # Erst vollständig schreiben, dann ersetzen - ein Abbruch hinterlässt kein halbes Manifest
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def unchanged(entry, input_path, output_path, columnar_path):
+    # Gleiche Größe und Änderungszeit reichen; sonst entscheidet der Inhalt (z. B. nur neu kopiert)
+    if not entry or entry.get("output") != output_path or entry.get("columnar") != columnar_path:
+        return False
+    if not os.path.exists(output_path) or (columnar_path and not os.path.exists(columnar_path)):
+        return False
+    st = os.stat(input_path)
+    if st.st_size != entry["size"]:
+        return False
+    if st.st_mtime_ns == entry["mtime_ns"]:
+        return True
+    if file_sha256(input_path) != entry["sha256"]:
+        return False
+    entry["mtime_ns"] = st.st_mtime_ns
+    return True
+
+def extract_one(input_path, output_path, columnar_path):
+    # Läuft im Worker-Prozess; Fehler einzelner Dateien brechen den Lauf nicht ab. Kaputte Archive
+    # melden sich wie in analysis/loading.frames_from_compressed; process_file ersetzt die Ausgaben
+    # erst nach Erfolg, ein Fehler hinterlässt also keine halbe Datei
+    try:
+        st = os.stat(input_path)
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        stats = process_file(input_path, output_path, columnar_path=columnar_path)
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": file_sha256(input_path),
+                 "output": output_path, "columnar": columnar_path}
+        return input_path, stats, entry, None
+    except (OSError, ValueError, EOFError, lzma.LZMAError, zipfile.BadZipFile) as e:
+        return input_path, None, None, str(e) or type(e).__name__
+
+def run_batch(paths, output_dir=None, jobs=1, columnar=False, manifest_path=None, force=False, progress_callback=None):
+    manifest_path = manifest_path or default_manifest_path(paths, output_dir)
+    manifest = load_manifest(manifest_path)
+    root = common_root(paths)
+    planned = [(path, *output_paths(path, output_dir, columnar, root)) for path in paths]
+    duplicates = duplicate_outputs(planned)
+    if duplicates:
+        raise ValueError("Mehrere Quellen ergeben dieselbe Ausgabe: " + "; ".join(duplicates))
+    todo, skipped = [], []
+    for path, output_path, columnar_path in planned:
+        if not force and unchanged(manifest.get(path), path, output_path, columnar_path):
+            skipped.append(path)
+        else:
+            todo.append((path, output_path, columnar_path))
+
+    summary = {"files": len(todo), "skipped": len(skipped), "failed": 0, "bytes": 0, "entries": 0}
+    errors = []
+    started = time.perf_counter()
+    saved = [started]
+
+    def collect(result):
+        path, stats, entry, error = result
+        if error:
+            summary["failed"] += 1
+            errors.append(f"{os.path.basename(path)}: {error}")
+        else:
+            summary["bytes"] += stats["bytes"]
+            summary["entries"] += stats["entries"]
+            manifest[path] = entry
+            if time.perf_counter() - saved[0] >= MANIFEST_SAVE_S:
+                save_manifest(manifest, manifest_path)
+                saved[0] = time.perf_counter()
+        if progress_callback:
+            progress_callback(path, stats, error)
+
+    try:
+        if jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = [pool.submit(extract_one, *job) for job in todo]
+                for future in as_completed(futures):
+                    collect(future.result())
+        else:
+            for job in todo:
+                collect(extract_one(*job))
+    finally:
+        # Auch bei Abbruch (Strg+C) den Stand der fertigen Dateien sichern
+        save_manifest(manifest, manifest_path)
+
+    seconds = time.perf_counter() - started
+    summary["seconds"] = round(seconds, 4)
+    summary["mb_per_sec"] = round(summary["bytes"] / 2**20 / seconds, 2) if seconds else None
+    summary["entries_per_sec"] = round(summary["entries"] / seconds) if seconds else None
+    return summary, errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Radio Trace Extractor - viele Traces parallel")
+    parser.add_argument("inputs", nargs="+", help="Ordner, Dateien oder Glob-Muster (in Anführungszeichen, ** für Unterordner)")
+    parser.add_argument("-o", "--output", help="Zielordner (Standard: neben der jeweiligen Quelle)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Anzahl gleichzeitig verarbeiteter Dateien (Standard: alle Kerne)")
+    parser.add_argument("--columnar", action="store_true", help="Zusätzlich das Spaltenformat (.rtc) schreiben")
+    parser.add_argument("--manifest", help=f"Manifestdatei (Standard: <zielordner>/{MANIFEST_NAME}, ohne -o im gemeinsamen Ordner der Quellen)")
+    parser.add_argument("--force", action="store_true", help="Auch unveränderte Traces neu extrahieren")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Messwerte als strukturierte Logzeilen ausgeben")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(name)s %(message)s")
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("Keine Traces gefunden")
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+
+    def report(path, stats, error):
+        print(f"{'Fehler' if error else 'Fertig'}: {os.path.basename(path)}"
+              + (f" ({error})" if error else f" ({stats['entries']} Einträge, {stats['seconds']:.1f} s)"))
+
+    try:
+        summary, errors = run_batch(paths, args.output, max(args.jobs, 1), args.columnar, args.manifest, args.force, report)
+    except ValueError as e:
+        parser.error(str(e))
+    perf_logger.info(json.dumps({"stage": "extract_batch", **summary}))
+    print(f"{summary['files'] - summary['failed']} extrahiert, {summary['skipped']} unverändert übersprungen, "
+          f"{summary['failed']} fehlgeschlagen")
+    if summary["files"] > summary["failed"]:
+        print(f"{summary['bytes'] / 2**20:.1f} MB, {summary['entries']} Einträge in {summary['seconds']:.1f} s "
+              f"({summary['mb_per_sec']} MB/s, {summary['entries_per_sec']} Einträge/s)")
+
+if __name__ == "__main__":
+    main()
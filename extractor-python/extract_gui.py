@@ -2,10 +2,10 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
 import threading
-from extract import process_file
+from extract import process_file, columnar_output_path, default_output_path, format_stats
 
 def select_file():
-    path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
+    path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json *.json.gz *.json.bz2 *.json.xz *.zip"), ("Alle Dateien", "*.*")])
     if path:
         input_path.set(path)
         output_path.set("")
@@ -13,8 +13,7 @@ def select_file():
 def select_output():
     folder = filedialog.askdirectory()
     if folder and input_path.get():
-        base = os.path.splitext(os.path.basename(input_path.get()))[0]
-        generated_name = base + "_extracted.json"
+        generated_name = os.path.basename(default_output_path(input_path.get()))
         output_path.set(os.path.join(folder, generated_name))
     elif not input_path.get():
         messagebox.showwarning("Hinweis", "Bitte zuerst eine Quelldatei auswählen.")
@@ -29,13 +28,18 @@ def run_conversion():
         progressbar["value"] = 0
         update_progress(0)
 
-        process_file(
+        columnar_path = columnar_output_path(output_path.get()) if columnar_var.get() else None
+        stats = process_file(
             input_path.get(),
             output_path.get(),
-            progress_callback=update_progress
+            progress_callback=update_progress,
+            workers=max(workers_var.get(), 1),
+            columnar_path=columnar_path,
+            incremental=incremental_var.get()
         )
 
-        messagebox.showinfo("Fertig", f"Datei wurde erfolgreich gespeichert als:\n{output_path.get()}")
+        saved = output_path.get() + (f"\n{columnar_path}" if columnar_path else "")
+        messagebox.showinfo("Fertig", f"Datei wurde erfolgreich gespeichert als:\n{saved}\n\n{format_stats(stats)}")
     except Exception as e:
         messagebox.showerror("Fehler", f"Fehler beim Verarbeiten:\n{e}")
     finally:
@@ -46,28 +50,38 @@ def run_thread():
     thread.start()
 
 # GUI
-root = tk.Tk()
-root.title("Radio Trace Extractor")
-root.geometry("500x380")
+# Nur beim direkten Start aufbauen - die Worker-Prozesse importieren dieses Modul erneut
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Radio Trace Extractor")
+    root.geometry("500x500")
 
-input_path = tk.StringVar()
-output_path = tk.StringVar()
-progress_var = tk.IntVar(value=0)
+    input_path = tk.StringVar()
+    output_path = tk.StringVar()
+    progress_var = tk.IntVar(value=0)
+    workers_var = tk.IntVar(value=os.cpu_count() or 1)
+    columnar_var = tk.BooleanVar(value=True)
+    incremental_var = tk.BooleanVar(value=False)
 
-tk.Label(root, text="Quelldatei (JSON):").pack(pady=5)
-tk.Entry(root, textvariable=input_path, width=60).pack()
-tk.Button(root, text="Durchsuchen...", command=select_file).pack()
+    tk.Label(root, text="Quelldatei (JSON):").pack(pady=5)
+    tk.Entry(root, textvariable=input_path, width=60).pack()
+    tk.Button(root, text="Durchsuchen...", command=select_file).pack()
 
-tk.Label(root, text="Zielordner:").pack(pady=5)
-tk.Button(root, text="Zielordner wählen...", command=select_output).pack()
-tk.Label(root, textvariable=output_path, wraplength=480, fg="gray").pack(pady=(5, 10))
+    tk.Label(root, text="Zielordner:").pack(pady=5)
+    tk.Button(root, text="Zielordner wählen...", command=select_output).pack()
+    tk.Label(root, textvariable=output_path, wraplength=480, fg="gray").pack(pady=(5, 10))
 
-progressbar = ttk.Progressbar(root, variable=progress_var, maximum=100, length=400)
-progressbar.pack(pady=(5, 0))
-percent_label = tk.Label(root, text="0 %", fg="gray")
-percent_label.pack()
+    tk.Label(root, text="Parallele Prozesse:").pack()
+    tk.Spinbox(root, from_=1, to=os.cpu_count() or 1, textvariable=workers_var, width=5).pack(pady=(0, 10))
+    tk.Checkbutton(root, text="Zusätzlich kompaktes Spaltenformat (.rtc) schreiben", variable=columnar_var).pack()
+    tk.Checkbutton(root, text="Nur neue Einträge anhängen (wachsender Trace)", variable=incremental_var).pack()
 
-convert_button = tk.Button(root, text="Verarbeiten", command=run_thread, bg="green", fg="white", padx=10, pady=5)
-convert_button.pack(pady=15)
+    progressbar = ttk.Progressbar(root, variable=progress_var, maximum=100, length=400)
+    progressbar.pack(pady=(5, 0))
+    percent_label = tk.Label(root, text="0 %", fg="gray")
+    percent_label.pack()
 
-root.mainloop()
+    convert_button = tk.Button(root, text="Verarbeiten", command=run_thread, bg="green", fg="white", padx=10, pady=5)
+    convert_button.pack(pady=15)
+
+    root.mainloop()
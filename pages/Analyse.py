@@ -1,10 +1,18 @@
+import os
 import streamlit as st
-import json
 import pandas as pd
 import altair as alt
 import pydeck as pdk
 from datetime import datetime
-from geopy.distance import geodesic
+from analysis.cache import FrameCache, content_hash
+from analysis.catalog import CatalogTrip, TripCatalog
+from analysis.binning import cell_size_for_zoom, grid_cells
+from analysis.engine import AnalysisEngine, MODES
+from analysis.loading import load_frames
+from analysis.lod import decimate, window
+from analysis.pipeline import percentile_band
+from analysis.perf import StageRecorder, configure_logging, start_memory_trace, stop_memory_trace
+from analysis.session_store import StoredFile, get_session_store
 
 if "auth" not in st.session_state:
     st.warning("Bitte zuerst einloggen.")
@@ -14,9 +22,14 @@ if "auth" not in st.session_state:
 st.set_page_config(page_title="Analyse", layout="wide")
 st.title("🔍 Analysebereich")
 
+store = get_session_store(st.session_state)
+
 # Falls zu löschende Datei gespeichert wurde
 if "file_to_remove" in st.session_state:
     filename = st.session_state.pop("file_to_remove")
+    for f in st.session_state.uploaded_files:
+        if f.name == filename and isinstance(f, StoredFile):
+            store.remove(f)
     st.session_state.uploaded_files = [f for f in st.session_state.uploaded_files if f.name != filename]
     st.success(f"✅ Datei `{filename}` wurde entfernt.")
 
@@ -33,7 +46,7 @@ if "uploaded_files" not in st.session_state or not st.session_state.uploaded_fil
 st.sidebar.header("📁 Aktive Fahrten")
 for i, file in enumerate(st.session_state.uploaded_files):
     col1, col2 = st.sidebar.columns([4, 1])
-    col1.write(f"📄 {file.name}")
+    col1.write(f"{'🗄️' if isinstance(file, CatalogTrip) else '📄'} {file.name}")
 
     # Statt direkt poppen → nur markieren
     if col2.button("❌", key=f"remove_{i}"):
@@ -41,11 +54,14 @@ for i, file in enumerate(st.session_state.uploaded_files):
         st.rerun()
 
 
-extra = st.sidebar.file_uploader("Weitere Dateien hinzufügen", type="json", accept_multiple_files=True, key="extra_upload")
+# Neuer Key nach jeder Übernahme leert das Feld, damit Streamlit die Upload-Bytes freigibt
+upload_round = st.session_state.setdefault("upload_round", 0)
+extra = st.sidebar.file_uploader("Weitere Dateien hinzufügen", type=["json", "rtc", "gz", "bz2", "xz", "zip"], accept_multiple_files=True, key=f"extra_upload_{upload_round}")
 if extra:
     for file in extra:
         if file.name not in [f.name for f in st.session_state.uploaded_files]:
-            st.session_state.uploaded_files.append(file)
+            st.session_state.uploaded_files.append(store.add(file.name, file.getvalue()))
+    st.session_state.upload_round += 1
     st.rerun()
 
 
@@ -54,96 +70,108 @@ if not st.session_state.uploaded_files:
     st.page_link("Home", label="⬅️ Zurück zur Startseite")
     st.stop()
 
+# ⏱️ Stufenmessung (Logzeilen immer, Panel und Speichermessung auf Wunsch)
+show_perf = st.sidebar.toggle("⏱️ Performance", value=False)
+if show_perf:
+    start_memory_trace()
+    st.session_state["perf_memory_trace"] = True
+elif st.session_state.pop("perf_memory_trace", False):
+    stop_memory_trace()
+configure_logging()
+perf = StageRecorder({"user": st.session_state.get("user")})
+
 # ---------------------------------------------
 # 🔄 Daten laden & vorbereiten
 # ---------------------------------------------
-raw_data = []
-for file in st.session_state.uploaded_files:
-    file_content = file.read()
-    file.seek(0)
-    if not file_content.strip():
-        st.warning(f"⚠️ Datei '{file.name}' ist leer.")
-        continue
-    try:
-        part = json.loads(file_content)
-        for entry in part:
-            entry["source"] = file.name
-        raw_data.extend(part)
-    except json.JSONDecodeError:
-        st.error(f"❌ Datei '{file.name}' ist kein gültiges JSON.")
-        continue
-
-
-def filter_entries(data, typ):
-    return [e for e in data if e.get("type") == typ]
-
-radio_mode = st.radio("🎙️ Radiomodus", ["DAB", "FM"], horizontal=True)
-radio_data = filter_entries(raw_data, "dab" if radio_mode == "DAB" else "fm")
-gnss_data = filter_entries(raw_data, "gnss")
+@st.cache_resource
+def get_engine():
+    # Gemeinsam für alle Sessions, Budgets in MB über RADIO_CACHE_MB / RADIO_RESULTS_MB / RADIO_PARTITIONS_MB einstellbar
+    return AnalysisEngine(
+        frame_cache=FrameCache(max_bytes=int(os.environ.get("RADIO_CACHE_MB", "1024")) << 20),
+        result_cache=FrameCache(max_bytes=int(os.environ.get("RADIO_RESULTS_MB", "256")) << 20),
+        partition_cache=FrameCache(max_bytes=int(os.environ.get("RADIO_PARTITIONS_MB", "512")) << 20)
+    )
 
-radio_df = pd.DataFrame(radio_data)
-gnss_df = pd.DataFrame(gnss_data)
+@st.cache_resource
+def get_catalog():
+    return TripCatalog()
+
+def file_digest(file, content):
+    # Hash pro Upload nur einmal berechnen
+    digests = st.session_state.setdefault("file_digests", {})
+    file_key = (getattr(file, "file_id", None), file.name, len(content))
+    if file_key not in digests:
+        digests[file_key] = content_hash(content)
+    return digests[file_key]
+
+engine = get_engine()
+loaded = []
+with perf.stage("load") as stage:
+    for file in list(st.session_state.uploaded_files):
+        if isinstance(file, CatalogTrip):
+            # Fahrten aus dem Katalog kommen ohne erneutes Parsen direkt aus SQLite
+            try:
+                loaded.append(engine.load_stored(file.name, file.digest, lambda: get_catalog().load(file.trip_id, file.name)))
+            except KeyError:
+                st.warning(f"⚠️ Fahrt '{file.name}' ist nicht mehr im Katalog.")
+            continue
+        try:
+            if isinstance(file, StoredFile):
+                # Digest steht seit dem Speichern fest: bei gecachten Frames wird die Datei gar nicht gelesen
+                try:
+                    loaded.append(engine.load_stored(file.name, file.digest, lambda: load_frames(file.name, file.getvalue())))
+                except FileNotFoundError:
+                    st.warning(f"⚠️ Datei '{file.name}' ist nicht mehr gespeichert, bitte erneut hochladen.")
+                    st.session_state.uploaded_files.remove(file)
+                continue
+            file_content = file.getvalue()
+            if not file_content or file_content.isspace():
+                st.warning(f"⚠️ Datei '{file.name}' ist leer.")
+                continue
+            loaded.append(engine.load(file.name, file_content, file_digest(file, file_content)))
+        except ValueError:
+            if file.name.endswith(".rtc"):
+                st.error(f"❌ Datei '{file.name}' ist keine gültige Spaltendatei.")
+            else:
+                st.error(f"❌ Datei '{file.name}' ist kein gültiges JSON.")
+            continue
+    stage["rows"] = sum(len(df) for _, frames in loaded for df in frames.values())
+trip_set = engine.trip_set(loaded)
 
-# 📻 Frequenzfilter bei DAB
-if radio_mode == "DAB" and "F_kHz" in radio_df.columns:
-    freq_counts = radio_df["F_kHz"].value_counts().sort_index()
-    freq_options = [f"{freq} kHz ({count})" for freq, count in freq_counts.items()]
-    freq_map = dict(zip(freq_options, freq_counts.index))
+# 💾 Speicher dieser Session: Uploads liegen auf der Platte, im RAM nur die zuletzt genutzten (nach dem Laden)
+usage = store.usage()
+st.sidebar.caption(
+    f"💾 Sitzungsspeicher: {usage['hot_bytes'] / 2**20:.1f} von {usage['hot_budget'] / 2**20:.0f} MB im RAM "
+    f"({usage['hot_files']} von {usage['files']} Dateien), {usage['disk_bytes'] / 2**20:.1f} MB auf der Platte"
+)
 
-    if len(freq_options) > 1:
-        selected_label = st.selectbox("🎚️ Frequenz auswählen (kHz):", freq_options)
+radio_mode = st.radio("🎙️ Radiomodus", ["DAB", "FM"], horizontal=True)
+selected_freq = None
+with perf.stage("filter") as stage:
+    freq_counts = engine.selection(trip_set, radio_mode).freq_counts
+
+    # 📻 Frequenzfilter, sobald mehr als eine Frequenz vorkommt; Auswahl bleibt je Modus erhalten
+    if len(freq_counts) > 1:
+        freq_options = [f"{freq} kHz ({count})" for freq, count in freq_counts.items()]
+        freq_map = dict(zip(freq_options, freq_counts.index))
+        selected_label = st.selectbox("🎚️ Frequenz auswählen (kHz):", freq_options, key=f"freq_{radio_mode}")
         selected_freq = freq_map[selected_label]
-        radio_df = radio_df[radio_df["F_kHz"] == selected_freq]
+    radio_df, gnss_df, _ = engine.selection(trip_set, radio_mode, selected_freq)
+    stage["rows"] = len(radio_df) + len(gnss_df)
 
 
 if radio_df.empty or gnss_df.empty:
     st.warning("Nicht genügend Daten vorhanden.")
     st.stop()
 
-radio_df["timeStamp"] = pd.to_datetime(radio_df["timeStamp"])
-gnss_df["timeStamp"] = pd.to_datetime(gnss_df["timeStamp"])
-
-# Referenzpunkt definieren
-shortest = gnss_df.groupby("source").size().idxmin()
-ref_start = gnss_df[gnss_df["source"] == shortest].iloc[0][["lat", "lon"]].values
-
-def get_start_timestamp_near_ref(gnss_df, source, ref_point):
-    df = gnss_df[gnss_df["source"] == source].copy()
-    df["distance_to_ref"] = df.apply(lambda row: geodesic((row["lat"], row["lon"]), ref_point).meters, axis=1)
-    nearest = df.loc[df["distance_to_ref"].idxmin()]
-    return nearest["timeStamp"]
-
-start_times = {}
-for src in radio_df["source"].unique():
-    gnss_time = get_start_timestamp_near_ref(gnss_df, src, ref_start)
-    sub_radio = radio_df[radio_df["source"] == src]
-    radio_after_gnss = sub_radio[sub_radio["timeStamp"] >= gnss_time]
-    if not radio_after_gnss.empty:
-        radio_start = radio_after_gnss.iloc[0]["timeStamp"]
-    else:
-        radio_start = sub_radio.iloc[0]["timeStamp"]
-    start_times[src] = radio_start
-
-sorted_sources = sorted(start_times, key=lambda k: start_times[k])
-
-if len(sorted_sources) >= 2:
-    src1, src2 = sorted_sources[0], sorted_sources[1]
-    start1, start2 = start_times[src1], start_times[src2]
-    fahrt1_df = radio_df[(radio_df["source"] == src1) & (radio_df["timeStamp"] >= start1) & (radio_df["timeStamp"] < start2)].copy()
-    fahrt2_df = radio_df[(radio_df["source"] == src2) & (radio_df["timeStamp"] >= start2)].copy()
-elif len(sorted_sources) == 1:
-    src1 = sorted_sources[0]
-    start1 = start_times[src1]
-    fahrt1_df = radio_df[(radio_df["source"] == src1) & (radio_df["timeStamp"] >= start1)].copy()
-    fahrt2_df = pd.DataFrame()
-else:
+# Referenzpunkt definieren, Fahrten ab dort ausschneiden
+with perf.stage("alignment", rows=len(radio_df)):
+    aligned = engine.alignment(trip_set, radio_mode, selected_freq)
+
+if aligned.trips.empty:
     st.warning("Keine gültigen Fahrten vorhanden.")
     st.stop()
 
-fahrt1_df["time_rel"] = (fahrt1_df["timeStamp"] - start1).dt.total_seconds()
-if not fahrt2_df.empty:
-    fahrt2_df["time_rel"] = (fahrt2_df["timeStamp"] - start2).dt.total_seconds()
-
 # ---------------------------------------------
 # 🧭 Tabs: Diagramm & Karte
 # ---------------------------------------------
@@ -155,33 +183,50 @@ tab1, tab2 = st.tabs(["📊 Vergleichsdiagramm", "🗺️ GNSS-Karte"])
 with tab1:
     st.header("📊 Vergleichsdiagramm")
 
-    selected_metric = "TL" if radio_mode == "DAB" else "FS"
+    selected_metric = MODES[radio_mode][1]
     y_label = "Tuner Level (dBm)" if selected_metric == "TL" else "Field Strength (dBμV)"
 
-    with st.expander("⚙️ Anzeigeoptionen"):
-        resample = st.selectbox("🕒 Zeitintervall", ["Original", "1s", "5s", "10s"], index=2)
+    options = st.expander("⚙️ Anzeigeoptionen")
+    with options:
+        alignment = st.radio("📏 Ausrichtung", ["Zeit seit Referenzpunkt", "Strecke entlang Referenzfahrt"], horizontal=True)
+        resample = st.selectbox("🕒 Zeitintervall", ["Adaptiv (LOD)", "Original", "1s", "5s", "10s"], index=3)
+        if resample.startswith("Adaptiv"):
+            max_points = st.number_input("🎯 Max. Punkte pro Fahrt", min_value=200, max_value=20000, value=2000, step=200)
         show_points = st.checkbox("🔵 Punkte anzeigen", value=False)
         connect_points = st.checkbox("📈 Linie", value=True)
         show_avg = st.checkbox("➕ Durchschnitt", value=False)
         show_trend = st.checkbox("📉 Tendenzlinie", value=False)
         show_reference = st.checkbox("🎯 Referenzbereich", value=True)
+        show_band = st.checkbox("🌫️ Flottenband (P10–P90, ab 3 Fahrten)", value=True)
 
-    chart_data = []
-    for df, src in zip([fahrt1_df, fahrt2_df], [src1, src2] if not fahrt2_df.empty else [src1]):
-        if df.empty:
-            continue
-        sub = df.set_index("timeStamp")[[selected_metric, "time_rel"]]
-        if resample != "Original":
-            sub = sub.resample(resample).mean().dropna()
-        sub["source"] = src
-        sub.reset_index(inplace=True)
-        chart_data.append(sub)
-
-    if not chart_data:
+    by_route = alignment.startswith("Strecke")
+    if by_route:
+        x_field, x_title = "route_pos", "Strecke entlang Referenzfahrt [m]"
+    else:
+        x_field, x_title = "time_rel", "Zeit seit Referenzpunkt [s]"
+
+    with perf.stage("chart_data") as stage:
+        combined_df = engine.chart_data(trip_set, radio_mode, selected_freq, resample, by_route)
+        stage["rows"] = len(combined_df)
+
+    if combined_df.empty:
         st.warning("Keine Daten für Diagramm vorhanden.")
     else:
-        combined_df = pd.concat(chart_data)
-        x_axis = alt.X("time_rel:Q", title="Zeit seit Referenzpunkt [s]")
+        # Sichtbarer Ausschnitt: Dezimierung und alle Ebenen beziehen sich nur darauf
+        min_x, max_x = float(combined_df[x_field].min()), float(combined_df[x_field].max())
+        if max_x > min_x:
+            with options:
+                x_range = st.slider("🔍 Ausschnitt", min_value=min_x, max_value=max_x, value=(min_x, max_x))
+            combined_df = window(combined_df, x_field, x_range)
+        n_trips = combined_df["source"].nunique()
+        if show_band and n_trips >= 3:
+            # Band aus allen Werten des Ausschnitts, vor der Dezimierung
+            with perf.stage("percentile_band", rows=len(combined_df)):
+                band_df = percentile_band(combined_df, x_field, selected_metric)
+        if resample.startswith("Adaptiv"):
+            combined_df = decimate(combined_df, x_field, selected_metric, int(max_points))
+
+        x_axis = alt.X(f"{x_field}:Q", title=x_title)
         color_scale = alt.Color("source:N", title="Fahrt")
         layers = []
 
@@ -200,8 +245,8 @@ with tab1:
                     {"name": "Mittel", "start": 20, "end": 40, "color": "#fff7b0"},
                     {"name": "Schlecht", "start": -20, "end": 20, "color": "#f2b0b0"}
                 ]
-            min_x = combined_df["time_rel"].min()
-            max_x = combined_df["time_rel"].max()
+            min_x = combined_df[x_field].min()
+            max_x = combined_df[x_field].max()
             for area in ref_areas:
                 bg_df = pd.DataFrame({
                     "x_start": [min_x],
@@ -215,6 +260,23 @@ with tab1:
                 )
                 layers.append(ref)
 
+        if show_band and n_trips >= 3:
+            band = alt.Chart(band_df).mark_area(opacity=0.3, color="#7f7f7f").encode(
+                x=alt.X("x:Q", title=x_title),
+                y=alt.Y("low:Q", title=y_label),
+                y2="high:Q",
+                tooltip=[
+                    alt.Tooltip("low:Q", title="P10", format=".1f"),
+                    alt.Tooltip("median:Q", title="Median", format=".1f"),
+                    alt.Tooltip("high:Q", title="P90", format=".1f"),
+                    alt.Tooltip("trips:Q", title="Fahrten")
+                ]
+            )
+            median = alt.Chart(band_df).mark_line(color="#4d4d4d", strokeDash=[6, 3]).encode(
+                x="x:Q", y="median:Q"
+            )
+            layers.extend([band, median])
+
         if show_points:
             points = alt.Chart(combined_df).mark_circle(size=30).encode(
                 x=x_axis,
@@ -237,85 +299,91 @@ with tab1:
             layers.append(lines)
 
         if show_avg:
-            for src in combined_df["source"].unique():
-                mean_val = combined_df[combined_df["source"] == src][selected_metric].mean()
-                rule = alt.Chart(pd.DataFrame({"y": [mean_val]})).mark_rule(strokeDash=[4, 2], color="gray").encode(y="y")
-                layers.append(rule)
+            # Eine Ebene für alle Fahrten statt einer Regel pro Fahrt
+            means = combined_df.groupby("source", observed=True)[selected_metric].mean().rename("y").reset_index()
+            rule = alt.Chart(means).mark_rule(strokeDash=[4, 2], color="gray").encode(y="y")
+            layers.append(rule)
 
         if show_trend:
-            for src in combined_df["source"].unique():
-                trend_data = combined_df[combined_df["source"] == src]
-                trend = alt.Chart(trend_data).transform_loess(
-                    "time_rel", selected_metric, bandwidth=0.3
-                ).mark_line(strokeDash=[2, 1]).encode(
-                    x=x_axis,
-                    y=alt.Y(selected_metric, title=y_label),
-                    color=alt.Color("source:N", legend=None)
-                )
-                layers.append(trend)
+            trend = alt.Chart(combined_df).transform_loess(
+                x_field, selected_metric, groupby=["source"], bandwidth=0.3
+            ).mark_line(strokeDash=[2, 1]).encode(
+                x=x_axis,
+                y=alt.Y(selected_metric, title=y_label),
+                color=alt.Color("source:N", legend=None)
+            )
+            layers.append(trend)
 
-        chart = alt.layer(*layers).properties(height=500).interactive()
-        st.altair_chart(chart, use_container_width=True)
+        # Serialisierung der Vega-Spezifikation passiert in st.altair_chart
+        with perf.stage("chart_render", rows=len(combined_df)):
+            chart = alt.layer(*layers).properties(height=500).interactive()
+            st.altair_chart(chart, use_container_width=True)
+
+    with st.expander(f"📋 Kennzahlen je Fahrt ({len(aligned.sorted_sources)})"):
+        st.dataframe(engine.trip_stats(trip_set, radio_mode, selected_freq))
 
 
 # ---------------------------------------------
 # 🗺️ Karte
 # ---------------------------------------------
+MAX_MAP_POINTS = 20000
+
 with tab2:
     st.header("🗺️ GNSS-Karte")
 
-    gnss_df = gnss_df[gnss_df["source"].isin(sorted_sources)].copy()
-    radio_df = radio_df[radio_df["source"].isin(sorted_sources)].copy()
-
-    def color_by_metric(val, is_dab):
-        if pd.isna(val): return [255, 255, 255]
-        if is_dab:
-            return [0, 180, 0] if val > -40 else [160, 220, 100] if val > -60 else [255, 220, 0] if val > -80 else [255, 70, 70]
-        else:
-            return [0, 180, 0] if val > 60 else [160, 220, 100] if val > 40 else [255, 220, 0] if val > 20 else [255, 70, 70]
-
-    def assign_colors(df, radio_df, col, is_dab):
-        df = df.sort_values("timeStamp").reset_index(drop=True)
-        vals, colors = [], []
-        for idx in range(len(df)):
-            if idx == 0:
-                vals.append(None)
-                colors.append([255, 255, 255])
-                continue
-            subset = radio_df[
-                (radio_df["source"] == df.loc[idx, "source"]) &
-                (radio_df["timeStamp"] > df.loc[idx - 1, "timeStamp"]) &
-                (radio_df["timeStamp"] <= df.loc[idx, "timeStamp"])
-            ]
-            val = subset[col].mean() if not subset.empty else None
-            vals.append(val)
-            colors.append(color_by_metric(val, is_dab))
-        df[col] = vals
-        df["color"] = colors
-        return df
-
-    gnss_df["timeStr"] = gnss_df["timeStamp"].dt.strftime("%H:%M:%S")
-
-    metric = "TL" if radio_mode == "DAB" else "FS"
-    gnss_df = assign_colors(gnss_df, radio_df, metric, radio_mode == "DAB")
+    metric = MODES[radio_mode][1]
+    with perf.stage("assign_colors", rows=len(gnss_df)):
+        gnss_df = engine.map_data(trip_set, radio_mode, selected_freq)
 
     mid_lat, mid_lon = gnss_df["lat"].mean(), gnss_df["lon"].mean()
 
-    layer = pdk.Layer(
-        "ScatterplotLayer",
-        data=gnss_df,
-        get_position="[lon, lat]",
-        get_radius=6,
-        get_fill_color="color",
-        pickable=True
-    )
-
-    st.pydeck_chart(pdk.Deck(
-        layers=[layer],
-        initial_view_state=pdk.ViewState(latitude=mid_lat, longitude=mid_lon, zoom=14),
-        map_style="mapbox://styles/mapbox/satellite-v9",
-        tooltip={"html": f"<b>Zeit:</b> {{timeStr}}<br/><b>{metric}:</b> {{{metric}}}", "style": {"color": "black"}}
-    ))
+    col_mode, col_zoom = st.columns([2, 1])
+    map_mode = col_mode.radio("🧩 Darstellung", ["Automatisch", "Einzelpunkte", "Raster"], horizontal=True)
+    zoom = col_zoom.slider("🔎 Zoomstufe", min_value=10, max_value=18, value=14)
+    # Große Datenmengen nur noch als Rasterzellen an den Browser schicken
+    use_grid = map_mode == "Raster" or (map_mode == "Automatisch" and len(gnss_df) > MAX_MAP_POINTS)
+
+    if use_grid:
+        cell_m = cell_size_for_zoom(zoom, mid_lat)
+        cells = grid_cells(gnss_df, metric, cell_m, radio_mode == "DAB")
+        layer = pdk.Layer(
+            "GridCellLayer",
+            data=cells,
+            get_position="[lon, lat]",
+            cell_size=cell_m,
+            extruded=False,
+            get_fill_color="[r, g, b]",
+            pickable=True
+        )
+        tooltip_html = f"<b>{metric} Ø:</b> {{{metric}}}<br/><b>{metric} min:</b> {{{metric}_min}}<br/><b>Werte:</b> {{samples}}<br/><b>Güte:</b> {{coverage}}"
+        st.caption(f"{len(gnss_df)} Fixes in {len(cells)} Zellen à {cell_m:.0f} m")
+    else:
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            # Uhrzeit als Text nur für die tatsächlich gezeichneten Punkte
+            data=gnss_df[["lon", "lat", "r", "g", "b", metric]].assign(timeStr=gnss_df["timeStamp"].dt.strftime("%H:%M:%S")),
+            get_position="[lon, lat]",
+            get_radius=6,
+            get_fill_color="[r, g, b]",
+            pickable=True
+        )
+        tooltip_html = f"<b>Zeit:</b> {{timeStr}}<br/><b>{metric}:</b> {{{metric}}}"
+
+    with perf.stage("map_render", rows=len(cells) if use_grid else len(gnss_df)):
+        st.pydeck_chart(pdk.Deck(
+            layers=[layer],
+            initial_view_state=pdk.ViewState(latitude=mid_lat, longitude=mid_lon, zoom=zoom),
+            map_style="mapbox://styles/mapbox/satellite-v9",
+            tooltip={"html": tooltip_html, "style": {"color": "black"}}
+        ))
 
     with st.expander("📋 GNSS-Tabelle anzeigen"):
-        st.dataframe(gnss_df)
\ No newline at end of file
+        st.dataframe(gnss_df)
+
+# ---------------------------------------------
+# ⏱️ Messwerte
+# ---------------------------------------------
+if show_perf:
+    with st.sidebar.expander("⏱️ Stufen", expanded=True):
+        st.dataframe(pd.DataFrame(perf.records), hide_index=True)
+        st.caption(f"Gesamt: {perf.total_seconds():.3f} s")
@@ -20,3 +20,5 @@ with open("extractor-python.zip", "rb") as f:
 st.info("""
 ℹ️ Der lokale Extractor kann über `extract_gui.py` gestartet werden und benötigt Python 3.
 """)
+
+st.page_link("pages/Ingest.py", label="⚙️ Oder Rohtraces direkt auf dem Server extrahieren")
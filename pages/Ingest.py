@@ -0,0 +1,96 @@
+import os
+import streamlit as st
+from analysis.extractor import format_stats
+from analysis.ingest import DONE, FAILED, WAITING, ExtractedFile, IngestQueue
+from analysis.session_store import get_session_store
+
+if "auth" not in st.session_state:
+    st.warning("Bitte zuerst einloggen.")
+    st.page_link("Home", label="⬅️ Zurück zur Startseite")
+    st.stop()
+
+st.set_page_config(page_title="⚙️ Extraktion", layout="centered")
+st.title("⚙️ Rohdaten auf dem Server extrahieren")
+
+st.markdown("""
+Rohtraces (auch .gz, .bz2, .xz oder ZIP) hier hochladen, statt sie vorher mit dem lokalen Extractor zu verarbeiten.
+Die Extraktion läuft im Hintergrund; du kannst die Seite verlassen und später zurückkommen.
+""")
+
+# Ein Pool für alle Sessions, weitere Aufträge warten
+@st.cache_resource
+def get_ingest_queue():
+    return IngestQueue()
+
+if "uploaded_files" not in st.session_state:
+    st.session_state.uploaded_files = []
+
+queue = get_ingest_queue()
+# Hält die Uploads dieser Session für purge_stale frisch, auch wenn hier nur Aufträge laufen
+store = get_session_store(st.session_state)
+owner = st.session_state.get("user")
+
+# Neuer Key nach jedem Start leert das Feld, damit Streamlit die (oft sehr großen) Rohtraces freigibt
+ingest_round = st.session_state.setdefault("ingest_round", 0)
+raw = st.file_uploader("📤 Rohtraces hochladen", type=["json", "gz", "bz2", "xz", "zip"], accept_multiple_files=True,
+                       key=f"ingest_{ingest_round}")
+if raw and st.button("▶️ Extraktion starten"):
+    running = {job.name for job in queue.jobs_for(owner) if not job.finished}
+    for file in raw:
+        if file.name in running:
+            st.info(f"'{file.name}' wird bereits extrahiert.")
+            continue
+        queue.submit(owner, file.name, file)
+    st.session_state.ingest_round += 1
+    st.rerun()
+
+jobs = queue.jobs_for(owner)
+active = any(not job.finished for job in jobs)
+
+# Nur dieser Teil wird während laufender Aufträge jede Sekunde neu gezeichnet
+@st.fragment(run_every=1 if active else None)
+def job_list():
+    jobs = queue.jobs_for(owner)
+    if not jobs:
+        st.info("Noch keine Aufträge.")
+        return
+    st.markdown("### 📋 Aufträge")
+    names = [f.name for f in st.session_state.uploaded_files]
+    for job in jobs:
+        with st.container(border=True):
+            col1, col2 = st.columns([4, 1])
+            col1.write(f"**{job.name}** – {job.state}")
+            if job.state == WAITING:
+                col1.caption(f"{queue.position(job)} Aufträge davor")
+            elif job.state == DONE:
+                col1.caption(format_stats(job.stats))
+            elif job.state == FAILED:
+                col1.error(f"❌ {job.error}")
+            if not job.finished:
+                st.progress(job.progress / 100)
+            elif col2.button("🗑️", key=f"remove_job_{job.id}"):
+                queue.remove(job.id)
+                st.rerun()
+
+            if job.state == DONE:
+                result = job.result()
+                col3, col4 = st.columns(2)
+                if result.name in names:
+                    col3.write("✅ In der Analyse")
+                elif col3.button("➕ Zur Analyse hinzufügen", key=f"add_job_{job.id}"):
+                    # Kopie im Sessionspeicher: unabhängig vom Auftrag, der gelöscht oder aufgeräumt werden kann
+                    st.session_state.uploaded_files.append(store.add(result.name, result.getvalue()))
+                    st.rerun()
+                # Datei erst beim Klick lesen, nicht bei jedem Polling-Durchlauf
+                col4.download_button("💾 JSON herunterladen", ExtractedFile(job.name, job.output_path).getvalue,
+                                     file_name=os.path.basename(job.output_path), mime="application/json",
+                                     key=f"download_job_{job.id}")
+    # Alle fertig: einmal die ganze Seite neu laden, damit das Polling endet
+    if active and not any(not job.finished for job in jobs):
+        st.rerun()
+
+job_list()
+
+if any(job.state == DONE for job in jobs):
+    if st.button("🔍 Analyse starten"):
+        st.switch_page("pages/Analyse.py")
@@ -1,12 +1,12 @@
 import json
+import os
+import sys
 
-with open("assets/gekürzt.json", "r", encoding="utf-8") as infile:
-    data = json.load(infile)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "extractor-python"))
+from extract import filter_tags
 
-dab_messages = [
-    entry for entry in data
-    if "msgData" in entry and ("LRID0x161" in entry["msgData"] or "LRID0x162" in entry["msgData"])
-]
+# Über den Tag-Index (assets/gekürzt.json.tags, wird bei Bedarf angelegt) nur die passenden Blöcke lesen
+dab_messages = list(filter_tags("assets/gekürzt.json", ["LRID0x161", "LRID0x162"]))
 
 with open("assets/dab.json", "w", encoding="utf-8") as outfile:
     json.dump(dab_messages, outfile, indent=2, ensure_ascii=False)
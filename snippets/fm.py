@@ -1,12 +1,12 @@
 import json
+import os
+import sys
 
-with open("assets/gekürzt.json", "r", encoding="utf-8") as infile:
-    data = json.load(infile)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "extractor-python"))
+from extract import filter_tags
 
-fm_messages = [
-    entry for entry in data
-    if "msgData" in entry and ("T[3/0x232]" in entry["msgData"] or "T[4/0x233]" in entry["msgData"])
-]
+# Über den Tag-Index (assets/gekürzt.json.tags, wird bei Bedarf angelegt) nur die passenden Blöcke lesen
+fm_messages = list(filter_tags("assets/gekürzt.json", ["T[3/0x232]", "T[4/0x233]"]))
 
 with open("assets/fm.json", "w", encoding="utf-8") as outfile:
     json.dump(fm_messages, outfile, indent=2, ensure_ascii=False)